@@ -0,0 +1,242 @@
+# Endpoint micro-benchmarks. Not picked up by the default test run:
+#
+#     python manage.py test benchmarks --pattern="bench_*.py"
+#
+# Each endpoint is measured against baseline.json and the run fails when
+# it issues more SQL queries, or gets markedly slower or hungrier, than the
+# baseline. Set BENCHMARK_UPDATE_BASELINE=1 to record a new baseline.
+
+import io
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from projects.models import Project
+from recipes.models import Combination, CombinationTag, Recipe
+from users.models import User
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "30"))
+WARMUP = 3
+LATENCY_TOLERANCE = float(os.getenv("BENCHMARK_LATENCY_TOLERANCE", "2.0"))
+LATENCY_SLACK_MS = 2.0
+MEMORY_TOLERANCE = 1.5
+MEMORY_SLACK_BYTES = 64 * 1024
+
+DATASET = {
+    "users": 400,
+    "projects": 40,
+    "members_per_project": 60,
+    "recipes_per_project": 30,
+    "combinations_per_recipe": 5,
+    "overrides_per_combination": 10,
+    "seed": 1234,
+    "prefix": "bench",
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class EndpointBenchmarks(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("generate_dataset", stdout=io.StringIO(), **DATASET)
+
+        cls.project = (
+            Project.objects
+            .annotate(members=Count("projectmember", filter=Q(projectmember__status="accepted")))
+            .order_by("-members", "name")
+            .first()
+        )
+        cls.owner = cls.project.root_admin
+        cls.member = (
+            User.objects
+            .annotate(joined=Count(
+                "projectmember",
+                filter=Q(projectmember__status="accepted")
+            ))
+            .order_by("-joined", "id")
+            .first()
+        )
+        cls.recipe = Recipe.objects.filter(project=cls.project).order_by("id").first()
+
+        combination_tags = {}
+        for combination_id, tag_id in CombinationTag.objects.values_list("combination_id", "tag_id"):
+            combination_tags.setdefault(combination_id, []).append(tag_id)
+        cls.create_payload_combinations = [
+            {
+                "id": combination_id,
+                "tag_values": [
+                    {"tag_id": tag_id, "value": 1.0}
+                    for tag_id in combination_tags[combination_id]
+                ],
+            }
+            for combination_id in Combination.objects.order_by("id").values_list("id", flat=True)[:5]
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        if os.getenv("BENCHMARK_UPDATE_BASELINE") == "1":
+            BASELINE_PATH.write_text(json.dumps(cls.results, indent=2, sort_keys=True) + "\n")
+
+        print()
+        print(f"{'endpoint':<30}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'peak KiB':>10}")
+        for name, result in sorted(cls.results.items()):
+            print(
+                f"{name:<30}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['queries']:>9}"
+                f"{result['peak_memory_bytes'] / 1024:>10.1f}"
+            )
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def measure(self, name, request, expected_status=200, before_each=None):
+        def run():
+            if before_each:
+                before_each()
+            response = request()
+            self.assertEqual(response.status_code, expected_status, getattr(response, "data", None))
+            return response
+
+        for _ in range(WARMUP):
+            run()
+
+        latencies = []
+        queries = 0
+        for _ in range(ITERATIONS):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                run()
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(captured))
+
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries": queries,
+            "peak_memory_bytes": peak,
+        }
+        self.results[name] = result
+        self.compare_with_baseline(name, result)
+
+    def compare_with_baseline(self, name, result):
+        if os.getenv("BENCHMARK_UPDATE_BASELINE") == "1" or not BASELINE_PATH.exists():
+            return
+
+        baseline = json.loads(BASELINE_PATH.read_text()).get(name)
+        if baseline is None:
+            return
+
+        self.assertLessEqual(
+            result["queries"],
+            baseline["queries"],
+            f"{name}: {result['queries']} queries, baseline {baseline['queries']}"
+        )
+        self.assertLessEqual(
+            result["p95_ms"],
+            baseline["p95_ms"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS,
+            f"{name}: p95 {result['p95_ms']:.2f}ms, baseline {baseline['p95_ms']:.2f}ms"
+        )
+        self.assertLessEqual(
+            result["peak_memory_bytes"],
+            baseline["peak_memory_bytes"] * MEMORY_TOLERANCE + MEMORY_SLACK_BYTES,
+            f"{name}: peak {result['peak_memory_bytes']}B, baseline {baseline['peak_memory_bytes']}B"
+        )
+
+    def test_owned_projects(self):
+        client = self.client_for(self.owner)
+        self.measure("owned_projects", lambda: client.get("/api/projects/owned/"))
+
+    def test_joined_projects(self):
+        client = self.client_for(self.member)
+        self.measure("joined_projects", lambda: client.get("/api/projects/joined/"))
+
+    def test_my_projects(self):
+        client = self.client_for(self.member)
+        self.measure("my_projects", lambda: client.get("/api/projects/my-projects/"))
+
+    def test_get_project_members(self):
+        client = self.client_for(self.owner)
+        self.measure(
+            "get_project_members",
+            lambda: client.get(f"/api/projects/{self.project.id}/members/", {"limit": 50})
+        )
+
+    def test_recipe_detail(self):
+        client = self.client_for(self.owner)
+        self.measure(
+            "recipe_detail",
+            lambda: client.get(f"/api/recipes/recipes/{self.recipe.id}/")
+        )
+
+    def test_combination_list(self):
+        client = self.client_for(self.owner)
+        self.measure(
+            "combination_list",
+            lambda: client.get("/api/recipes/combinations/"),
+            before_each=cache.clear
+        )
+
+    def test_create_recipe(self):
+        client = self.client_for(self.owner)
+        counter = iter(range(10 ** 6))
+        url = f"/api/recipes/projects/{self.project.id}/recipes/create/"
+
+        self.measure(
+            "create_recipe",
+            lambda: client.post(
+                url,
+                {
+                    "name": f"Bench {next(counter)}",
+                    "combinations": self.create_payload_combinations,
+                },
+                format="json"
+            ),
+            expected_status=201
+        )
+
+    def test_search_projects(self):
+        client = self.client_for(self.member)
+        self.measure(
+            "search_projects",
+            lambda: client.get("/api/projects/search/", {"q": "bench pro"})
+        )
+
+    def test_search_users_for_invitation(self):
+        client = self.client_for(self.owner)
+        self.measure(
+            "search_users_for_invitation",
+            lambda: client.get(f"/api/projects/{self.project.id}/search-users/", {"email": "bench-user-1"}),
+            before_each=cache.clear
+        )
@@ -0,0 +1,139 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger("config.hashing")
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server is busy, please try again shortly"
+    default_code = "hashing_busy"
+
+
+def setup_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def pbkdf2_encode(password, salt, iterations):
+    return PBKDF2PasswordHasher().encode(password, salt, iterations)
+
+
+# With PASSWORD_HASHING_WORKERS set, PBKDF2 runs in a small process pool so
+# the work leaves the request process. The request thread still waits for
+# the result. At most PASSWORD_HASHING_MAX_PENDING hashes run or wait at
+# once per process; beyond that, or past PASSWORD_HASHING_TIMEOUT, callers
+# get a 503 instead of queueing.
+class HashingPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.slots = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def get_executor(self, workers):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=setup_worker,
+                    initargs=(os.environ["DJANGO_SETTINGS_MODULE"],)
+                )
+            return self.executor
+
+    def acquire(self):
+        with self.lock:
+            if self.slots is None:
+                self.slots = threading.BoundedSemaphore(
+                    getattr(settings, "PASSWORD_HASHING_MAX_PENDING", 8)
+                )
+
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            logger.warning(json.dumps({"event": "hashing_pool_full", **self.stats()}))
+            raise HashingBusy()
+
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self, elapsed_ms):
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+        self.slots.release()
+
+    def run(self, func, *args):
+        self.acquire()
+        started = time.perf_counter()
+
+        def finished(*_):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.release(elapsed_ms)
+            logger.debug(json.dumps({
+                "event": "hash",
+                "function": func.__name__,
+                "ms": round(elapsed_ms, 2),
+            }))
+
+        workers = getattr(settings, "PASSWORD_HASHING_WORKERS", 0)
+        if not workers:
+            try:
+                return func(*args)
+            finally:
+                finished()
+
+        try:
+            future = self.get_executor(workers).submit(func, *args)
+        except Exception:
+            finished()
+            raise
+
+        # The slot is held until the worker is done, even if we stop waiting.
+        future.add_done_callback(finished)
+        try:
+            return future.result(timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT", 10))
+        except TimeoutError:
+            logger.warning(json.dumps({"event": "hashing_timeout", **self.stats()}))
+            raise HashingBusy()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.completed, 2) if self.completed else 0.0,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+pool = HashingPool()
+
+
+# Registered first in PASSWORD_HASHERS under the stock pbkdf2_sha256 name,
+# so existing hashes keep verifying and Django's make_password,
+# check_password and rehash-on-login all go through the pool.
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    def encode(self, password, salt, iterations=None):
+        return pool.run(pbkdf2_encode, password, salt, iterations or self.iterations)
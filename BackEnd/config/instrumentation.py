@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework import throttling
+
+current_metrics = ContextVar("current_metrics", default=None)
+
+
+# Adds the elapsed time to the given RequestMetrics field. Nested blocks
+# timing the same field (a serializer inside a serializer) only count the
+# outermost one. A no-op while instrumentation is off.
+@contextmanager
+def timed(field):
+    metrics = current_metrics.get()
+    if metrics is None or field in metrics.timing:
+        yield
+        return
+
+    metrics.timing.add(field)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, field, getattr(metrics, field) + (time.perf_counter() - started) * 1000)
+        metrics.timing.discard(field)
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle):
+    def allow_request(self, request, view):
+        with timed("throttle_ms"):
+            return super().allow_request(request, view)
+
+
+# ListSerializer runs these once per item, so many=True is covered too.
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        with timed("serializer_ms"):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args, **kwargs):
+        with timed("serializer_ms"):
+            return super().run_validation(*args, **kwargs)
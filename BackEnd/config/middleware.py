@@ -0,0 +1,127 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .instrumentation import current_metrics
+
+logger = logging.getLogger("config.instrumentation")
+
+PLACEHOLDER_LIST = re.compile(r"%s(?:, %s)+")
+SINGLE_IN_LIST = re.compile(r"\bIN \(%s\)")
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.view_name = None
+        self.throttle_scope = None
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.render_ms = 0.0
+        self.throttle_ms = 0.0
+        self.serializer_ms = 0.0
+        self.timing = set()
+        self.query_shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.query_count += 1
+            shape = PLACEHOLDER_LIST.sub("%s, ...", sql)
+            self.query_shapes[SINGLE_IN_LIST.sub("IN (%s, ...)", shape)] += 1
+
+    def repeated_queries(self, threshold):
+        return [
+            {"sql": sql[:300], "count": count}
+            for sql, count in self.query_shapes.most_common()
+            if count >= threshold
+        ]
+
+
+# Opt-in (REQUEST_INSTRUMENTATION=True). Adds a Server-Timing header and
+# logs one JSON line per request with query count, DB, render, throttle and
+# serializer time, plus any SQL shape repeated often enough to be an N+1.
+class RequestInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.threshold = getattr(settings, "REQUEST_INSTRUMENTATION_REPEAT_THRESHOLD", 5)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        token = current_metrics.set(metrics)
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        app_ms = max(
+            0.0,
+            total_ms - metrics.db_ms - metrics.render_ms - metrics.throttle_ms - metrics.serializer_ms
+        )
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db_ms:.2f};desc="{metrics.query_count} queries"',
+            f"render;dur={metrics.render_ms:.2f}",
+            f"throttle;dur={metrics.throttle_ms:.2f}",
+            f"serializer;dur={metrics.serializer_ms:.2f}",
+            f"app;dur={app_ms:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ])
+
+        repeated = metrics.repeated_queries(self.threshold)
+        line = json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "view": metrics.view_name,
+            "throttle_scope": metrics.throttle_scope,
+            "queries": metrics.query_count,
+            "db_ms": round(metrics.db_ms, 2),
+            "render_ms": round(metrics.render_ms, 2),
+            "throttle_ms": round(metrics.throttle_ms, 2),
+            "serializer_ms": round(metrics.serializer_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "repeated_queries": repeated,
+        })
+
+        if repeated:
+            logger.warning(line)
+        else:
+            logger.info(line)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request.request_metrics
+        view_class = getattr(view_func, "cls", None)
+        name = view_class.__name__ if view_class else view_func.__name__
+        metrics.view_name = f"{view_func.__module__}.{name}"
+        metrics.throttle_scope = (
+            getattr(view_func, "throttle_scope", None)
+            or getattr(view_class, "throttle_scope", None)
+        )
+
+    def process_template_response(self, request, response):
+        metrics = request.request_metrics
+        started = time.perf_counter()
+
+        def rendered(response):
+            metrics.render_ms += (time.perf_counter() - started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
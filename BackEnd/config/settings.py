@@ -2,6 +2,7 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
@@ -11,6 +12,7 @@ DEBUG = os.getenv("DJANGO_DEBUG") == "True"
 
 ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS").split(",")
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS").split(",")
+CORS_ALLOW_HEADERS = (*default_headers, "x-project-access")
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -37,6 +39,7 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    "config.middleware.RequestInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,7 +58,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.ScopedRateThrottle",
+        "config.instrumentation.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         # Authentication
@@ -82,6 +85,59 @@ REST_FRAMEWORK = {
     },
 }
 
+# Seconds invite-dialog user searches are cached per project.
+USER_DIRECTORY_CACHE_TIMEOUT = int(os.getenv("USER_DIRECTORY_CACHE_TIMEOUT", "30"))
+
+# Per-request SQL/timing instrumentation (Server-Timing header and a JSON
+# log line); a SQL shape repeated this many times is reported as an N+1.
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION") == "True"
+REQUEST_INSTRUMENTATION_REPEAT_THRESHOLD = int(
+    os.getenv("REQUEST_INSTRUMENTATION_REPEAT_THRESHOLD", "5")
+)
+
+# PBKDF2 for passwords, access keys and PINs can run in a process pool of
+# this many workers (0 hashes in the request thread). Hashes beyond
+# MAX_PENDING in flight per process, or slower than TIMEOUT seconds, are
+# refused with a 503 rather than queued.
+PASSWORD_HASHERS = [
+    "config.hashing.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", "0"))
+PASSWORD_HASHING_MAX_PENDING = int(os.getenv("PASSWORD_HASHING_MAX_PENDING", "8"))
+PASSWORD_HASHING_TIMEOUT = int(os.getenv("PASSWORD_HASHING_TIMEOUT", "10"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "config.instrumentation": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "config.hashing": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+# Seconds a user's resolved project role is cached; 0 disables the cache
+# and leaves only the per-request memo.
+PROJECT_ACCESS_CACHE_TIMEOUT = int(os.getenv("PROJECT_ACCESS_CACHE_TIMEOUT", "0"))
+
+# Require the signed token returned by verify-password (sent back in the
+# X-Project-Access header) on project-scoped endpoints for non-owners.
+PROJECT_ACCESS_TOKEN_REQUIRED = os.getenv("PROJECT_ACCESS_TOKEN_REQUIRED") == "True"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from config.hashing import HashingBusy, HashingPool, pbkdf2_encode
+from config.middleware import RequestMetrics
+from projects.models import Project
+from users.models import User
+
+
+@override_settings(REQUEST_INSTRUMENTATION=True, REQUEST_INSTRUMENTATION_REPEAT_THRESHOLD=2)
+class RequestInstrumentationMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="owner@example.com", full_name="Owner")
+        for idx in range(3):
+            Project.objects.create(
+                name=f"Project {idx}",
+                root_admin=cls.owner,
+                access_key_hash="!",
+                pin_hash="!"
+            )
+
+    def test_reports_timings_and_view(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        with self.assertLogs("config.instrumentation", level="INFO") as logs:
+            response = client.get("/api/projects/owned/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertIn("throttle;dur=", response["Server-Timing"])
+        self.assertIn("serializer;dur=", response["Server-Timing"])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "projects.views.owned_projects")
+        self.assertEqual(line["throttle_scope"], "general")
+        self.assertGreaterEqual(line["queries"], 1)
+        self.assertIn("throttle_ms", line)
+        self.assertGreater(line["serializer_ms"], 0)
+
+    def test_flags_repeated_query_shapes(self):
+        metrics = RequestMetrics()
+        execute = lambda sql, params, many, context: None
+
+        for ids in ([1], [1, 2], [1, 2, 3]):
+            placeholders = ", ".join(["%s"] * len(ids))
+            metrics(execute, f"SELECT * FROM t WHERE id IN ({placeholders})", ids, False, {})
+        metrics(execute, "SELECT 1", [], False, {})
+
+        self.assertEqual(metrics.query_count, 4)
+        self.assertEqual(metrics.repeated_queries(2), [
+            {"sql": "SELECT * FROM t WHERE id IN (%s, ...)", "count": 3}
+        ])
+
+
+class HashingPoolTests(TestCase):
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_hashes_in_worker_process(self):
+        encoded = make_password("s3cret-key")
+
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$"))
+        self.assertTrue(check_password("s3cret-key", encoded))
+        self.assertFalse(check_password("wrong", encoded))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_TIMEOUT=0)
+    def test_timeout_is_a_503_and_keeps_the_slot_until_the_worker_is_done(self):
+        pool = HashingPool()
+
+        with self.assertRaises(HashingBusy), self.assertLogs("config.hashing", "WARNING"):
+            pool.run(pbkdf2_encode, "s3cret-key", "salt", 1000)
+        self.addCleanup(pool.executor.shutdown)
+        self.assertEqual(pool.stats()["in_flight"], 1)
+
+        deadline = time.monotonic() + 60
+        while pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(pool.stats()["completed"], 1)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_full_pool_fails_fast_with_503(self):
+        owner = User.objects.create_user(email="owner@example.com", full_name="Owner")
+        project = Project.objects.create(
+            name="Project",
+            root_admin=owner,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        project.set_access_key("s3cret-key")
+        project.save()
+
+        busy = HashingPool()
+        busy.slots = threading.BoundedSemaphore(1)
+        busy.slots.acquire()
+
+        client = APIClient()
+        client.force_authenticate(owner)
+        with mock.patch("config.hashing.pool", busy), self.assertLogs("config.hashing", "WARNING"):
+            response = client.post(
+                f"/api/projects/{project.id}/verify-password/",
+                {"password": "s3cret-key"},
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(busy.stats()["rejected"], 1)
@@ -0,0 +1,46 @@
+from django.core import signing
+
+ACCESS_TOKEN_SALT = "projects.access"
+ACCESS_TOKEN_HEADER = "HTTP_X_PROJECT_ACCESS"
+ACCESS_TTL_HOURS = 24
+MAX_ACCESS_TOKENS = 20
+
+
+# A signed (user, project, generation) triple with a timestamp, checked
+# without touching the database. Bumping Project.access_generation revokes
+# every token issued before it.
+def issue_access_token(user, project):
+    return signing.dumps(
+        {"u": user.id, "p": project.id.hex, "g": project.access_generation},
+        salt=ACCESS_TOKEN_SALT,
+        compress=True
+    )
+
+
+def read_access_tokens(request):
+    # The client sends the tokens it holds as a comma-separated header.
+    tokens = {}
+    header = request.META.get(ACCESS_TOKEN_HEADER, "")
+
+    for token in header.split(",")[:MAX_ACCESS_TOKENS]:
+        try:
+            payload = signing.loads(
+                token.strip(),
+                salt=ACCESS_TOKEN_SALT,
+                max_age=ACCESS_TTL_HOURS * 3600
+            )
+        except signing.BadSignature:
+            continue
+
+        if payload.get("u") == request.user.id:
+            tokens[payload.get("p")] = payload.get("g")
+
+    return tokens
+
+
+def has_access_token(request, access):
+    if not hasattr(request, "_project_access_tokens"):
+        request._project_access_tokens = read_access_tokens(request)
+
+    generation = request._project_access_tokens.get(access.project_id.hex)
+    return generation is not None and generation == access.access_generation
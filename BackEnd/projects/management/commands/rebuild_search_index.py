@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the project and recipe full-text search index"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            rebuild_search_index()
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,133 @@
+from .models import ProjectAccessEntry, ProjectMember
+from .permissions import invalidate_project_access
+from .utils import revoke_access_tokens
+
+MAX_MEMBER_OPERATIONS = 500
+MEMBER_ACTIONS = ("change_role", "revoke")
+MEMBER_ROLES = ("admin", "user")
+
+
+class MemberBatchError(Exception):
+    pass
+
+
+# Same status rules as the single-member endpoints: change_role only applies
+# to accepted members (change_member_role 404s on the rest), and revoke
+# removes a member in any status, pending invitations included. The one
+# difference is the last-admin check: it counts accepted admins left after
+# the whole batch, where revoke_member_access refuses to remove any admin
+# row while at most one accepted admin exists.
+def validate_operation(operation, members, root_admin_id, seen):
+    if not isinstance(operation, dict):
+        return "Operation must be an object"
+
+    member_id = operation.get("member_id")
+    action = operation.get("action")
+
+    if not isinstance(member_id, int) or isinstance(member_id, bool):
+        return "member_id must be an integer"
+    if action not in MEMBER_ACTIONS:
+        return f"action must be one of {', '.join(MEMBER_ACTIONS)}"
+    if member_id in seen:
+        return "Member appears more than once in this batch"
+    seen.add(member_id)
+
+    member = members.get(member_id)
+    if member is None:
+        return "Member not found"
+    if member["user_id"] == root_admin_id:
+        return "Cannot change the project owner"
+
+    if action == "change_role":
+        if operation.get("role") not in MEMBER_ROLES:
+            return "Invalid role"
+        if member["status"] != "accepted":
+            return "Only accepted members can change role"
+
+    return None
+
+
+# Validates every operation, checks that the project keeps at least one
+# admin once the valid ones are applied, then writes them with one
+# bulk_update and one delete. bulk_update skips the membership signals, so
+# role changes update the access entries here. Must run inside a
+# transaction.
+def apply_member_operations(project, operations):
+    member_ids = [
+        operation.get("member_id")
+        for operation in operations
+        if isinstance(operation, dict) and isinstance(operation.get("member_id"), int)
+    ]
+    members = {
+        member["id"]: member
+        for member in (
+            ProjectMember.objects
+            .select_for_update()
+            .filter(project=project, id__in=member_ids)
+            .values("id", "user_id", "role", "status")
+        )
+    }
+    current_admins = set(
+        ProjectMember.objects
+        .filter(project=project, role="admin", status="accepted")
+        .values_list("id", flat=True)
+    )
+    admins = set(current_admins)
+
+    results = []
+    role_changes = []
+    revoked = []
+    seen = set()
+
+    for operation in operations:
+        error = validate_operation(operation, members, project.root_admin_id, seen)
+        member_id = operation.get("member_id") if isinstance(operation, dict) else None
+        action = operation.get("action") if isinstance(operation, dict) else None
+
+        if error:
+            results.append({"member_id": member_id, "action": action, "status": "error", "detail": error})
+            continue
+
+        member = members[member_id]
+        if action == "revoke":
+            revoked.append(member)
+            admins.discard(member_id)
+            results.append({"member_id": member_id, "action": action, "status": "revoked"})
+            continue
+
+        role = operation["role"]
+        if role == "admin":
+            admins.add(member_id)
+        else:
+            admins.discard(member_id)
+        if role != member["role"]:
+            role_changes.append((member, role))
+        results.append({"member_id": member_id, "action": action, "status": "updated", "role": role})
+
+    if current_admins and not admins:
+        raise MemberBatchError(
+            "This batch would leave the project without an admin. "
+            "Keep or assign at least one admin."
+        )
+
+    if role_changes:
+        ProjectMember.objects.bulk_update(
+            [ProjectMember(id=member["id"], role=role) for member, role in role_changes],
+            ["role"]
+        )
+        for role in MEMBER_ROLES:
+            user_ids = [member["user_id"] for member, new_role in role_changes if new_role == role]
+            if user_ids:
+                ProjectAccessEntry.objects.filter(project=project, user_id__in=user_ids).update(role=role)
+
+    if revoked:
+        # A plain QuerySet.delete(): the membership signals run for each
+        # revoked member and remove its access entry, adjust member_count
+        # and clear its caches.
+        ProjectMember.objects.filter(id__in=[member["id"] for member in revoked]).delete()
+        revoke_access_tokens(project.id)
+
+    for member, _ in role_changes:
+        invalidate_project_access(member["user_id"], project.id)
+
+    return results
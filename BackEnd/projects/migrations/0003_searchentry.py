@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('recipes', '0006_recipecombinationtagvalue_recipes_rec_tag_id_d6b4e3_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('recipe', 'Recipe')], max_length=10)),
+                ('object_id', models.CharField(max_length=36)),
+                ('project_id', models.UUIDField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE projects_search_fts USING fts5("
+                "name, code, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')",
+                "INSERT INTO projects_searchentry (kind, object_id, project_id) "
+                "SELECT 'project', id, id FROM projects_project",
+                "INSERT INTO projects_searchentry (kind, object_id, project_id) "
+                "SELECT 'recipe', CAST(id AS TEXT), project_id FROM recipes_recipe",
+                "INSERT INTO projects_search_fts (rowid, name, code) "
+                "SELECT e.id, p.name, p.public_code FROM projects_searchentry e "
+                "JOIN projects_project p ON p.id = e.object_id WHERE e.kind = 'project'",
+                "INSERT INTO projects_search_fts (rowid, name, code) "
+                "SELECT e.id, r.name, '' FROM projects_searchentry e "
+                "JOIN recipes_recipe r ON CAST(r.id AS TEXT) = e.object_id WHERE e.kind = 'recipe'",
+            ],
+            reverse_sql="DROP TABLE projects_search_fts",
+        ),
+    ]
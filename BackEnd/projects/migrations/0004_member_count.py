@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_members(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectMember = apps.get_model("projects", "ProjectMember")
+
+    # Keyset pagination on joined_at needs it set for every accepted member.
+    ProjectMember.objects.filter(status="accepted", joined_at__isnull=True).update(
+        joined_at=F("invited_at")
+    )
+
+    accepted = (
+        ProjectMember.objects
+        .filter(project=OuterRef("pk"), status="accepted")
+        .order_by()
+        .values("project")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Project.objects.update(member_count=Coalesce(Subquery(accepted), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_searchentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='projectmember',
+            index=models.Index(condition=models.Q(('status', 'accepted')), fields=['project', 'joined_at', 'id'], name='member_accepted_joined_idx'),
+        ),
+        migrations.RunPython(backfill_members, migrations.RunPython.noop),
+    ]
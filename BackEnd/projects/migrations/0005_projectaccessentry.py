@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_access_entries(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectMember = apps.get_model("projects", "ProjectMember")
+    ProjectAccessEntry = apps.get_model("projects", "ProjectAccessEntry")
+
+    ProjectAccessEntry.objects.bulk_create(
+        [
+            ProjectAccessEntry(
+                user_id=root_admin_id,
+                project_id=project_id,
+                role="root_admin",
+                project_created_at=created_at,
+            )
+            for project_id, root_admin_id, created_at in (
+                Project.objects.values_list("id", "root_admin_id", "created_at").iterator()
+            )
+        ],
+        batch_size=2000
+    )
+    ProjectAccessEntry.objects.bulk_create(
+        [
+            ProjectAccessEntry(
+                user_id=user_id,
+                project_id=project_id,
+                role=role,
+                project_created_at=created_at,
+            )
+            for user_id, project_id, role, created_at in (
+                ProjectMember.objects
+                .filter(status="accepted")
+                .values_list("user_id", "project_id", "role", "project__created_at")
+                .iterator()
+            )
+        ],
+        batch_size=2000,
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_member_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccessEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=10)),
+                ('project_created_at', models.DateTimeField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_access_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'project_created_at', 'id'], name='projects_pr_user_id_8cd40c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='unique_project_access_entry')],
+            },
+        ),
+        migrations.RunPython(backfill_access_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_projectaccessentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='access_generation',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.DeleteModel(
+            name='ProjectAccessSession',
+        ),
+    ]
@@ -1,6 +1,5 @@
 import uuid
 import secrets
-from datetime import timedelta
 
 from django.db import models
 from django.conf import settings
@@ -38,6 +37,13 @@ class Project(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Accepted members, excluding the root admin; see refresh_member_counts.
+    member_count = models.PositiveIntegerField(default=0)
+
+    # Bumped to invalidate every project access token issued so far; see
+    # projects.access_tokens.
+    access_generation = models.PositiveIntegerField(default=1)
+
     def set_access_key(self, raw_access_key: str):
         self.access_key_hash = make_password(raw_access_key)
 
@@ -103,32 +109,68 @@ class ProjectMember(models.Model):
             models.Index(fields=["project", "status"]),
             models.Index(fields=["user", "status"]),
             models.Index(fields=["project", "role", "status"]),
+            models.Index(
+                fields=["project", "joined_at", "id"],
+                condition=models.Q(status="accepted"),
+                name="member_accepted_joined_idx"
+            ),
         ]
 
+    # Status as last read from or written to the database; the membership
+    # signals compare against it to keep Project.member_count in step. None
+    # when unknown (not loaded from the database, or status deferred).
+    loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_status = instance.__dict__.get("status")
+        return instance
+
     def __str__(self):
         return f"{self.user.email} → {self.project.name} ({self.status})"
 
 
-class ProjectAccessSession(models.Model):
+class ProjectAccessEntry(models.Model):
+    # One row per project a user can open (owned or accepted membership),
+    # in the order the project lists paginate, so "all my projects" is a
+    # single index range scan.
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        related_name="project_access_entries"
     )
-
     project = models.ForeignKey(
         Project,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        related_name="access_entries"
     )
-
-    expires_at = models.DateTimeField()
+    role = models.CharField(max_length=10)
+    project_created_at = models.DateTimeField()
 
     class Meta:
-        unique_together = ("user", "project")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "project"],
+                name="unique_project_access_entry"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "project_created_at", "id"]),
+        ]
+
 
-    def is_active(self):
-        return self.expires_at > timezone.now()
+class SearchEntry(models.Model):
+    KIND_CHOICES = (
+        ("project", "Project"),
+        ("recipe", "Recipe"),
+    )
 
-    def extend(self, hours=24):
-        if self.expires_at - timezone.now() < timedelta(hours=2):
-            self.expires_at = timezone.now() + timedelta(hours=hours)
-            self.save(update_fields=["expires_at"])
+    # Row ids of the projects_search_fts FTS5 table; project_id is kept
+    # without a foreign key so entries are removed with the FTS rows.
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=36)
+    project_id = models.UUIDField(db_index=True)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
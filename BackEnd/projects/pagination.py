@@ -24,22 +24,51 @@ def parse_cursor(cursor_str):
         return None
 
 
+# Returns None for a limit that is not an integer so the view can 400.
+def parse_limit(value, default, maximum):
+    if value is None or value == "":
+        return default
+
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(1, min(limit, maximum))
+
+
+def cursor_value(obj, field):
+    if isinstance(obj, dict):
+        return obj[field]
+
+    for attr in field.split("__"):
+        obj = getattr(obj, attr)
+    return obj
+
+
 def encode_cursor(obj, date_field="created_at"):
     return json.dumps({
-        "created_at": getattr(obj, date_field).isoformat(),
-        "id": str(obj.id)
+        "created_at": cursor_value(obj, date_field).isoformat(),
+        "id": str(cursor_value(obj, "id"))
     })
 
 
-def cursor_paginate(queryset, cursor, limit, date_field="created_at"):
+def cursor_paginate(queryset, cursor, limit, date_field="created_at", descending=True):
     if cursor:
         cursor_date, cursor_id = cursor
+        op = "lt" if descending else "gt"
+        # The redundant inclusive bound gives SQLite a range to seek the
+        # index with, so later pages cost the same as the first.
         queryset = queryset.filter(
-            Q(**{f"{date_field}__lt": cursor_date}) |
-            Q(**{date_field: cursor_date, "id__lt": cursor_id})
+            Q(**{f"{date_field}__{op}e": cursor_date}),
+            Q(**{f"{date_field}__{op}": cursor_date}) |
+            Q(**{date_field: cursor_date, f"id__{op}": cursor_id})
         )
 
-    queryset = queryset.order_by(f"-{date_field}", "-id")
+    if descending:
+        queryset = queryset.order_by(f"-{date_field}", "-id")
+    else:
+        queryset = queryset.order_by(date_field, "id")
 
     items = list(queryset[: limit + 1])
     has_more = len(items) > limit
@@ -49,4 +78,4 @@ def cursor_paginate(queryset, cursor, limit, date_field="created_at"):
     if has_more and results:
         next_cursor = encode_cursor(results[-1], date_field)
 
-    return results, has_more, next_cursor
\ No newline at end of file
+    return results, has_more, next_cursor
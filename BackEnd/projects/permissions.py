@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q, FilteredRelation
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import BasePermission
+
+from .access_tokens import has_access_token
+from .models import Project
+
+PROJECT_ROLES = ("root_admin", "admin", "user")
+
+
+def access_cache_key(user_id, project_id):
+    return f"projects:access:{user_id}:{project_id}"
+
+
+class ProjectAccess:
+    def __init__(self, project_id, member_role, member_status, access_generation=None, project=None):
+        self.project_id = project_id
+        self.member_role = member_role
+        self.member_status = member_status
+        self.access_generation = access_generation
+        self._project = project
+
+    @property
+    def role(self):
+        if self.member_status == "accepted":
+            return self.member_role
+        return None
+
+    @property
+    def is_owner(self):
+        return self.role == "root_admin"
+
+    @property
+    def project(self):
+        if self._project is None:
+            self._project = Project.objects.get(id=self.project_id)
+        return self._project
+
+    def as_cache_value(self):
+        return (self.project_id, self.member_role, self.member_status, self.access_generation)
+
+
+def load_project_access(user, project_id=None, recipe_id=None):
+    qs = Project.objects.annotate(
+        membership=FilteredRelation(
+            "projectmember",
+            condition=Q(projectmember__user=user)
+        ),
+        member_role=F("membership__role"),
+        member_status=F("membership__status"),
+    )
+
+    if recipe_id is not None:
+        qs = qs.filter(recipes__id=recipe_id)
+    else:
+        qs = qs.filter(id=project_id)
+
+    project = qs.first()
+    if project is None:
+        return None
+
+    if project.root_admin_id == user.id:
+        return ProjectAccess(
+            project.id, "root_admin", "accepted", project.access_generation, project
+        )
+
+    return ProjectAccess(
+        project.id,
+        project.member_role,
+        project.member_status,
+        project.access_generation,
+        project
+    )
+
+
+def get_project_access(request, project_id=None, recipe_id=None):
+    if not hasattr(request, "_project_access"):
+        request._project_access = {}
+    memo = request._project_access
+    memo_key = ("recipe", recipe_id) if recipe_id is not None else str(project_id)
+
+    if memo_key in memo:
+        return memo[memo_key]
+
+    timeout = getattr(settings, "PROJECT_ACCESS_CACHE_TIMEOUT", 0)
+    access = None
+
+    if timeout and recipe_id is None:
+        cached = cache.get(access_cache_key(request.user.id, project_id))
+        if cached is not None:
+            access = ProjectAccess(*cached)
+
+    if access is None:
+        access = load_project_access(request.user, project_id, recipe_id)
+
+        if timeout and access is not None:
+            cache.set(
+                access_cache_key(request.user.id, access.project_id),
+                access.as_cache_value(),
+                timeout
+            )
+
+    memo[memo_key] = access
+    if access is not None:
+        memo[str(access.project_id)] = access
+
+    return access
+
+
+def invalidate_project_access(user_id, project_id):
+    cache.delete(access_cache_key(user_id, project_id))
+
+
+class ProjectRolePermission(BasePermission):
+    allowed_roles = PROJECT_ROLES
+    message = "Access denied"
+
+    def has_permission(self, request, view):
+        project_id = view.kwargs.get("project_id")
+        recipe_id = view.kwargs.get("recipe_id")
+
+        # Views whose URL names no project check the object they load with
+        # check_object_permissions instead.
+        if project_id is None and recipe_id is None:
+            return True
+
+        return self.has_project_access(request, project_id=project_id, recipe_id=recipe_id)
+
+    def has_object_permission(self, request, view, obj):
+        return self.has_project_access(request, project_id=obj.project_id)
+
+    def has_project_access(self, request, project_id=None, recipe_id=None):
+        if not request.user or not request.user.is_authenticated:
+            return False
+
+        access = get_project_access(request, project_id=project_id, recipe_id=recipe_id)
+
+        if access is None:
+            raise NotFound()
+
+        if access.role not in self.allowed_roles:
+            return False
+
+        # Members also need a project access token from verify-password;
+        # the owner is never asked for the project password.
+        if (
+            getattr(settings, "PROJECT_ACCESS_TOKEN_REQUIRED", False)
+            and not access.is_owner
+            and not has_access_token(request, access)
+        ):
+            # project_id lets the client ask for the right password when
+            # the URL does not name the project (recipe endpoints, clones).
+            raise PermissionDenied({
+                "detail": "Project password required",
+                "project_id": str(access.project_id),
+            })
+
+        return True
+
+
+class IsProjectMember(ProjectRolePermission):
+    pass
+
+
+class IsProjectAdmin(ProjectRolePermission):
+    allowed_roles = ("root_admin", "admin")
+    message = "Only project admins can perform this action"
+
+
+class IsProjectOwner(ProjectRolePermission):
+    allowed_roles = ("root_admin",)
+    message = "Only the project owner can perform this action"
@@ -0,0 +1,140 @@
+import re
+import uuid
+
+from django.db import connection
+
+from recipes.models import Recipe
+from .models import Project, SearchEntry
+
+SEARCH_TABLE = "projects_search_fts"
+MAX_SEARCH_TOKENS = 8
+
+
+def index_documents(kind, documents):
+    # documents: [(object_id, project_id, name, code)]
+    if not documents:
+        return
+
+    SearchEntry.objects.bulk_create(
+        [
+            SearchEntry(kind=kind, object_id=object_id, project_id=project_id)
+            for object_id, project_id, _, _ in documents
+        ],
+        update_conflicts=True,
+        unique_fields=["kind", "object_id"],
+        update_fields=["project_id"]
+    )
+    # An upsert does not return the ids of rows that already existed, so
+    # read them back by key rather than trusting the returned order.
+    entry_ids = dict(
+        SearchEntry.objects
+        .filter(kind=kind, object_id__in=[object_id for object_id, _, _, _ in documents])
+        .values_list("object_id", "id")
+    )
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, name, code) VALUES (%s, %s, %s)",
+            [
+                (entry_ids[object_id], name, code)
+                for object_id, _, name, code in documents
+            ]
+        )
+
+
+def index_projects(projects):
+    index_documents("project", [
+        (project.id.hex, project.id, project.name, project.public_code)
+        for project in projects
+    ])
+
+
+def index_recipes(recipes):
+    index_documents("recipe", [
+        (str(recipe.id), recipe.project_id, recipe.name, "")
+        for recipe in recipes
+    ])
+
+
+def remove_project_documents(project_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+            "(SELECT id FROM projects_searchentry WHERE project_id = %s)",
+            [project_id.hex]
+        )
+    SearchEntry.objects.filter(project_id=project_id).delete()
+
+
+def match_expression(q):
+    tokens = re.findall(r"\w+", q.lower())[:MAX_SEARCH_TOKENS]
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+# Ranked FTS5 prefix match, joined to the projects the user owns or is an
+# accepted member of through ProjectAccessEntry. Name hits rank above
+# public code hits. Archived recipes stay indexed but are never returned.
+def search_documents(user, q, kind, limit):
+    expression = match_expression(q)
+    if not expression:
+        return []
+
+    archived_join = ""
+    if kind == "recipe":
+        archived_join = (
+            f"JOIN {Recipe._meta.db_table} r "
+            "ON r.id = CAST(e.object_id AS INTEGER) AND NOT r.is_archived"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT e.object_id, {SEARCH_TABLE}.name, p.id, p.name, p.public_code, a.role
+            FROM {SEARCH_TABLE}
+            JOIN projects_searchentry e ON e.id = {SEARCH_TABLE}.rowid
+            JOIN projects_projectaccessentry a
+              ON a.project_id = e.project_id AND a.user_id = %s
+            JOIN projects_project p ON p.id = e.project_id
+            {archived_join}
+            WHERE {SEARCH_TABLE} MATCH %s
+              AND e.kind = %s
+            ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0)
+            LIMIT %s
+            """,
+            [user.id, expression, kind, limit]
+        )
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "object_id": object_id,
+            "name": name,
+            "project_id": uuid.UUID(project_id),
+            "project_name": project_name,
+            "public_code": public_code,
+            "role": role,
+        }
+        for object_id, name, project_id, project_name, public_code, role in rows
+    ]
+
+
+def rebuild_search_index(chunk_size=2000):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    SearchEntry.objects.all().delete()
+
+    # Keyset chunks: each read finishes before its index writes run.
+    for queryset, index in (
+        (Project.objects.only("id", "name", "public_code"), index_projects),
+        (Recipe.objects.only("id", "name", "project_id"), index_recipes),
+    ):
+        last_id = None
+        while True:
+            chunk_qs = queryset.order_by("id")
+            if last_id is not None:
+                chunk_qs = chunk_qs.filter(id__gt=last_id)
+            chunk = list(chunk_qs[:chunk_size])
+            if not chunk:
+                break
+            index(chunk)
+            last_id = chunk[-1].id
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from config.instrumentation import TimedSerializerMixin
 from .models import Project
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     role = serializers.CharField()
     is_owner = serializers.BooleanField()
 
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from users.directory import invalidate_directory_search
+from .models import Project, ProjectMember
+from .permissions import invalidate_project_access
+from .search import index_projects, remove_project_documents
+from .utils import (
+    adjust_member_count,
+    refresh_member_counts,
+    owner_access_entry,
+    sync_member_access,
+    remove_member_access,
+)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def project_member_changed(sender, instance, **kwargs):
+    invalidate_project_access(instance.user_id, instance.project_id)
+    invalidate_directory_search(instance.project_id)
+
+
+@receiver(post_save, sender=ProjectMember)
+def project_member_saved(sender, instance, created, update_fields=None, **kwargs):
+    sync_member_access(instance)
+
+    if update_fields is not None and "status" not in update_fields:
+        return
+
+    # Only a move to or from accepted changes the counter; a full recount
+    # is left for when the previous status is unknown.
+    previous = "pending" if created else instance.loaded_status
+    if previous is None:
+        refresh_member_counts([instance.project_id])
+    elif (previous == "accepted") != (instance.status == "accepted"):
+        adjust_member_count(instance.project_id, 1 if instance.status == "accepted" else -1)
+    instance.loaded_status = instance.status
+
+
+@receiver(post_delete, sender=ProjectMember)
+def project_member_deleted(sender, instance, **kwargs):
+    remove_member_access(instance)
+
+    if instance.loaded_status is None:
+        refresh_member_counts([instance.project_id])
+    elif instance.loaded_status == "accepted":
+        adjust_member_count(instance.project_id, -1)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    index_projects([instance])
+
+    if created:
+        owner_access_entry(instance).save()
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    invalidate_project_access(instance.root_admin_id, instance.id)
+    remove_project_documents(instance.id)
@@ -1 +1,555 @@
-from django.test import TestCase
\ No newline at end of file
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import User
+from .models import Project, ProjectMember, ProjectAccessEntry
+from .search import index_recipes, rebuild_search_index
+
+
+class ProjectTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="owner@example.com", full_name="Owner")
+        cls.admin = User.objects.create_user(email="admin@example.com", full_name="Admin")
+        cls.member = User.objects.create_user(email="member@example.com", full_name="Member")
+        cls.outsider = User.objects.create_user(email="outsider@example.com", full_name="Outsider")
+
+        cls.project = Project.objects.create(
+            name="Line 1",
+            root_admin=cls.owner,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        cls.admin_membership = ProjectMember.objects.create(
+            project=cls.project,
+            user=cls.admin,
+            role="admin",
+            status="accepted",
+            joined_at=timezone.now()
+        )
+        cls.membership = ProjectMember.objects.create(
+            project=cls.project,
+            user=cls.member,
+            role="user",
+            status="accepted",
+            joined_at=timezone.now()
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+
+class ProjectPermissionTests(ProjectTestCase):
+    def test_roles_are_resolved_per_view(self):
+        overview = f"/api/projects/{self.project.id}/overview/"
+        members = f"/api/projects/{self.project.id}/members/"
+
+        self.assertEqual(self.as_user(self.owner).get(overview).data["role"], "root_admin")
+        self.assertEqual(self.as_user(self.member).get(overview).data["role"], "user")
+        self.assertEqual(self.as_user(self.outsider).get(overview).status_code, 403)
+        self.assertEqual(self.as_user(self.member).get(members).status_code, 403)
+        self.assertEqual(self.as_user(self.admin).get(members).status_code, 200)
+
+    def test_pending_members_are_denied(self):
+        ProjectMember.objects.filter(id=self.membership.id).update(status="pending")
+
+        response = self.as_user(self.member).get(f"/api/projects/{self.project.id}/overview/")
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_project_returns_404(self):
+        response = self.as_user(self.owner).get(
+            "/api/projects/00000000-0000-0000-0000-000000000000/overview/"
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_recipe_views_resolve_access_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.as_user(self.member).get(
+                f"/api/recipes/projects/{self.project.id}/recipes/"
+            )
+
+        self.assertEqual(len(queries), 2)
+
+    @override_settings(PROJECT_ACCESS_CACHE_TIMEOUT=60)
+    def test_cached_access_is_invalidated_on_membership_change(self):
+        url = f"/api/recipes/projects/{self.project.id}/recipes/"
+        self.as_user(self.member).get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.as_user(self.member).get(url)
+        self.assertEqual(len(queries), 1)
+
+        self.membership.status = "rejected"
+        self.membership.save()
+
+        self.assertEqual(self.as_user(self.member).get(url).status_code, 403)
+
+
+class SearchProjectsTests(ProjectTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = Project.objects.create(
+            name="Line 2 Extrusion",
+            root_admin=cls.outsider,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        Recipe.objects.create(name="Extrusion base", project=cls.project)
+        Recipe.objects.create(name="Extrusion hidden", project=cls.other)
+
+    def search(self, user, q):
+        response = self.as_user(user).get("/api/projects/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_prefix_search_is_limited_to_accessible_projects(self):
+        data = self.search(self.member, "lin")
+
+        self.assertEqual([r["name"] for r in data["results"]], ["Line 1"])
+        self.assertEqual(data["results"][0]["role"], "user")
+        self.assertEqual(
+            [r["name"] for r in self.search(self.member, "extru")["recipes"]],
+            ["Extrusion base"]
+        )
+        self.assertEqual(
+            self.search(self.owner, self.project.public_code[5:9])["results"][0]["is_owner"],
+            True
+        )
+
+    def test_index_follows_renames_and_deletes(self):
+        self.project.name = "Packaging"
+        self.project.save(update_fields=["name"])
+
+        self.assertEqual(self.search(self.owner, "line")["results"], [])
+        self.assertEqual(len(self.search(self.owner, "pack")["results"]), 1)
+
+        self.project.delete()
+
+        self.assertEqual(self.search(self.owner, "pack")["results"], [])
+        self.assertEqual(self.search(self.owner, "extru")["recipes"], [])
+
+    def test_limit_is_validated_and_clamped(self):
+        url = "/api/projects/search/"
+        Recipe.objects.create(name="Extrusion second", project=self.project)
+
+        self.assertEqual(self.as_user(self.owner).get(url, {"q": "extru", "limit": "x"}).status_code, 400)
+        response = self.as_user(self.owner).get(url, {"q": "extru", "limit": -1})
+        self.assertEqual(len(response.data["recipes"]), 1)
+
+    def test_rebuild_reindexes_in_chunks(self):
+        Recipe.objects.create(name="Extrusion second", project=self.project)
+
+        rebuild_search_index(chunk_size=1)
+
+        self.assertEqual(len(self.search(self.owner, "extru")["recipes"]), 2)
+        self.assertEqual(len(self.search(self.owner, "line")["results"]), 1)
+
+    def test_archived_recipes_are_not_returned(self):
+        Recipe.objects.filter(name="Extrusion base").update(is_archived=True)
+
+        self.assertEqual(self.search(self.member, "extru")["recipes"], [])
+
+    def test_reindexing_keeps_each_name_on_its_own_entry(self):
+        recipes = list(Recipe.objects.order_by("id"))
+        recipes[0].name = "Extrusion renamed"
+        Recipe.objects.create(name="Extrusion extra", project=self.project)
+
+        index_recipes([Recipe.objects.get(name="Extrusion extra"), recipes[0]])
+
+        self.assertEqual(
+            sorted(r["name"] for r in self.search(self.owner, "extru")["recipes"]),
+            ["Extrusion extra", "Extrusion renamed"]
+        )
+
+
+class SearchUsersForInvitationTests(ProjectTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.candidate = User.objects.create_user(email="john.doe@example.com", full_name="John Doe")
+
+    def search(self, q):
+        response = self.as_user(self.owner).get(
+            f"/api/projects/{self.project.id}/search-users/",
+            {"email": q}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [r["email"] for r in response.data["results"]]
+
+    def test_matches_tokens_and_compact_email_prefixes(self):
+        self.assertEqual(self.search("johnd"), ["john.doe@example.com"])
+        self.assertEqual(self.search("doe joh"), ["john.doe@example.com"])
+        self.assertEqual(self.search("John.Doe@exa"), ["john.doe@example.com"])
+
+    def test_excludes_members_and_requester(self):
+        self.assertEqual(
+            sorted(self.search("example")),
+            ["john.doe@example.com", "outsider@example.com"]
+        )
+
+        ProjectMember.objects.create(
+            project=self.project,
+            user=self.candidate,
+            role="user",
+            status="accepted"
+        )
+
+        self.assertEqual(self.search("example"), ["outsider@example.com"])
+
+    def test_repeated_searches_hit_the_cache(self):
+        self.search("outs")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search("outs"), ["outsider@example.com"])
+
+        self.assertFalse(any("users_directory_fts" in q["sql"] for q in queries))
+
+    def test_directory_follows_profile_changes(self):
+        self.candidate.email = "jane.roe@example.com"
+        self.candidate.save()
+
+        self.assertEqual(self.search("johnd"), [])
+        self.assertEqual(self.search("jane"), ["jane.roe@example.com"])
+
+
+class ProjectMembersTests(ProjectTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for idx in range(5):
+            ProjectMember.objects.create(
+                project=cls.project,
+                user=User.objects.create_user(email=f"user{idx}@example.com", full_name=f"User {idx}"),
+                role="user",
+                status="accepted",
+                joined_at=timezone.now()
+            )
+        ProjectMember.objects.create(
+            project=cls.project,
+            user=cls.outsider,
+            role="user",
+            status="pending"
+        )
+
+    def test_pages_with_cursor_and_counter(self):
+        url = f"/api/projects/{self.project.id}/members/"
+        client = self.as_user(self.admin)
+
+        pages = [client.get(url, {"limit": 3}).data]
+        while pages[-1]["has_more"]:
+            with CaptureQueriesContext(connection) as queries:
+                pages.append(client.get(url, {"limit": 3, "cursor": pages[-1]["next_cursor"]}).data)
+            self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
+        members = [m for page in pages for m in page["results"]]
+        self.assertEqual(pages[0]["count"], 8)
+        self.assertEqual([len(page["results"]) for page in pages], [3, 3, 2])
+        self.assertEqual(members[0]["role"], "root_admin")
+        self.assertEqual([m["role"] for m in members].count("root_admin"), 1)
+        self.assertEqual(len({m["user_id"] for m in members}), 8)
+
+    def test_counter_follows_membership_changes(self):
+        pending = ProjectMember.objects.get(project=self.project, user=self.outsider)
+        pending.status = "accepted"
+        pending.joined_at = timezone.now()
+        pending.save()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.member_count, 8)
+
+        self.membership.delete()
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.member_count, 7)
+
+    def test_counter_is_only_written_when_accepted_status_changes(self):
+        member = ProjectMember.objects.filter(project=self.project, status="accepted").first()
+        member.role = "admin"
+
+        with CaptureQueriesContext(connection) as queries:
+            member.save()
+        self.assertFalse([q for q in queries if 'UPDATE "projects_project"' in q["sql"]])
+
+        member.status = "rejected"
+        with CaptureQueriesContext(connection) as queries:
+            member.save()
+        sql = " ".join(q["sql"] for q in queries)
+        self.assertIn("member_count", sql)
+        self.assertNotIn("COUNT", sql)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.member_count, 6)
+
+
+class MyProjectsTests(ProjectTestCase):
+    def test_lists_owned_and_accepted_projects_from_access_index(self):
+        other = Project.objects.create(
+            name="Line 2",
+            root_admin=self.member,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        pending = ProjectMember.objects.create(
+            project=other,
+            user=self.admin,
+            role="user",
+            status="pending"
+        )
+        url = "/api/projects/my-projects/"
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.as_user(self.member).get(url, {"limit": 1}).data
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("DISTINCT", queries[0]["sql"])
+
+        rest = self.as_user(self.member).get(url, {"limit": 1, "cursor": data["next_cursor"]}).data
+        self.assertEqual(
+            [(p["name"], p["role"]) for p in data["results"] + rest["results"]],
+            [("Line 2", "root_admin"), ("Line 1", "user")]
+        )
+        self.assertFalse(rest["has_more"])
+
+        self.assertEqual(
+            [p["name"] for p in self.as_user(self.admin).get(url).data["results"]],
+            ["Line 1"]
+        )
+        pending.status = "accepted"
+        pending.save()
+        self.assertEqual(
+            [p["name"] for p in self.as_user(self.admin).get(url).data["results"]],
+            ["Line 2", "Line 1"]
+        )
+        pending.delete()
+        self.assertEqual(len(self.as_user(self.admin).get(url).data["results"]), 1)
+
+    def test_owner_keeps_root_admin_role(self):
+        response = self.as_user(self.owner).post(
+            f"/api/projects/{self.project.id}/invite/",
+            {"user_id": self.owner.id},
+            format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        ProjectMember.objects.create(
+            project=self.project,
+            user=self.owner,
+            role="user",
+            status="accepted"
+        )
+        results = self.as_user(self.owner).get("/api/projects/my-projects/").data["results"]
+        self.assertEqual([p["role"] for p in results], ["root_admin"])
+
+
+@override_settings(PROJECT_ACCESS_TOKEN_REQUIRED=True)
+class ProjectAccessTokenTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project.set_access_key("secret-key")
+        self.project.save(update_fields=["access_key_hash"])
+        self.overview = f"/api/projects/{self.project.id}/overview/"
+
+    def verify(self, user, password="secret-key"):
+        return self.as_user(user).post(
+            f"/api/projects/{self.project.id}/verify-password/",
+            {"password": password},
+            format="json"
+        )
+
+    def test_members_need_a_token_and_the_owner_does_not(self):
+        response = self.as_user(self.member).get(self.overview)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["detail"], "Project password required")
+        self.assertEqual(self.as_user(self.owner).get(self.overview).status_code, 200)
+
+        self.assertEqual(self.verify(self.member, "wrong").status_code, 401)
+        token = self.verify(self.member).data["access_token"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.as_user(self.member).get(self.overview, HTTP_X_PROJECT_ACCESS=token)
+        self.assertEqual(response.status_code, 200)
+        with self.settings(PROJECT_ACCESS_TOKEN_REQUIRED=False):
+            self.assertNumQueries(len(queries), self.as_user(self.member).get, self.overview)
+
+        # Tokens are bound to the user they were issued to.
+        response = self.as_user(self.admin).get(self.overview, HTTP_X_PROJECT_ACCESS=token)
+        self.assertEqual(response.status_code, 403)
+
+    def test_access_key_change_and_revocation_invalidate_tokens(self):
+        token = self.verify(self.member).data["access_token"]
+
+        self.as_user(self.owner).post(
+            f"/api/projects/{self.project.id}/change-access-key/",
+            {"new_access_key": "another-key"},
+            format="json"
+        )
+        response = self.as_user(self.member).get(self.overview, HTTP_X_PROJECT_ACCESS=token)
+        self.assertEqual(response.status_code, 403)
+
+        token = self.verify(self.admin, "another-key").data["access_token"]
+        self.assertEqual(
+            self.as_user(self.admin).get(self.overview, HTTP_X_PROJECT_ACCESS=token).status_code,
+            200
+        )
+        self.as_user(self.owner).delete(
+            f"/api/projects/{self.project.id}/members/{self.membership.id}/revoke/"
+        )
+
+        response = self.as_user(self.admin).get(self.overview, HTTP_X_PROJECT_ACCESS=token)
+        self.assertEqual(response.status_code, 403)
+
+
+class CreateProjectTests(ProjectTestCase):
+    def create(self, members):
+        return self.as_user(self.owner).post(
+            "/api/projects/create/",
+            {"name": "Line 9", "access_key": "secret-key", "members": members},
+            format="json"
+        )
+
+    def test_roster_is_resolved_and_inserted_in_bulk(self):
+        roster = User.objects.bulk_create([
+            User(email=f"Roster{idx}@Example.com", full_name=f"Roster {idx}")
+            for idx in range(40)
+        ])
+        members = [
+            {"email": user.email.upper(), "role": "admin" if idx == 0 else "user"}
+            for idx, user in enumerate(roster)
+        ]
+        members.append({"email": "OWNER@example.com", "role": "user"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create(members)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLessEqual(len(queries), 12)
+
+        project = Project.objects.get(id=response.data["id"])
+        self.assertEqual(project.member_count, 40)
+        self.assertEqual(
+            ProjectMember.objects.filter(project=project, status="accepted").count(),
+            40
+        )
+        self.assertEqual(ProjectAccessEntry.objects.filter(project=project).count(), 41)
+        self.assertEqual(
+            ProjectAccessEntry.objects.get(project=project, user=roster[0]).role,
+            "admin"
+        )
+
+    def test_non_ascii_emails_match_like_the_database(self):
+        User.objects.create_user(email="Élodie@Example.com", full_name="Élodie")
+
+        response = self.create([{"email": "Élodie@example.COM", "role": "Admin"}])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Project.objects.get(id=response.data["id"]).member_count, 1)
+
+    def test_rejects_unknown_role_before_inserting(self):
+        response = self.create([
+            {"email": "admin@example.com", "role": "admin"},
+            {"email": "member@example.com", "role": "owner"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Project.objects.filter(name="Line 9").exists())
+
+    def test_reports_every_unknown_email(self):
+        response = self.create([
+            {"email": "admin@example.com", "role": "admin"},
+            {"email": "ghost1@example.com", "role": "user"},
+            {"email": "Ghost2@example.com", "role": "user"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["unknown_emails"],
+            ["ghost1@example.com", "ghost2@example.com"]
+        )
+        self.assertFalse(Project.objects.filter(name="Line 9").exists())
+
+
+class BulkMemberOperationsTests(ProjectTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.users = [
+            ProjectMember.objects.create(
+                project=cls.project,
+                user=User.objects.create_user(email=f"user{idx}@example.com", full_name=f"User {idx}"),
+                role="user",
+                status="accepted",
+                joined_at=timezone.now()
+            )
+            for idx in range(6)
+        ]
+
+    def bulk(self, operations):
+        return self.as_user(self.owner).post(
+            f"/api/projects/{self.project.id}/members/bulk/",
+            {"operations": operations},
+            format="json"
+        )
+
+    def test_rejects_boolean_member_ids(self):
+        response = self.bulk([{"member_id": True, "action": "revoke"}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["detail"], "member_id must be an integer")
+
+    def test_applies_batch_and_reports_per_item(self):
+        operations = [
+            {"member_id": self.users[0].id, "action": "change_role", "role": "admin"},
+            {"member_id": self.admin_membership.id, "action": "change_role", "role": "user"},
+            {"member_id": 999999, "action": "revoke"},
+        ] + [
+            {"member_id": member.id, "action": "revoke"}
+            for member in self.users[1:]
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk(operations)
+
+        self.assertEqual(response.status_code, 200)
+        # The delete runs the membership signals: two queries per revoked member.
+        self.assertLessEqual(len(queries), 12 + 2 * 5)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["updated", "updated", "error"] + ["revoked"] * 5
+        )
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.member_count, 3)
+        self.assertEqual(
+            dict(ProjectMember.objects.filter(project=self.project).values_list("id", "role")),
+            {self.users[0].id: "admin", self.admin_membership.id: "user", self.membership.id: "user"}
+        )
+        self.assertEqual(
+            dict(ProjectAccessEntry.objects.filter(project=self.project).values_list("user_id", "role")),
+            {
+                self.owner.id: "root_admin",
+                self.users[0].user_id: "admin",
+                self.admin.id: "user",
+                self.member.id: "user",
+            }
+        )
+
+    def test_rejects_batch_that_removes_every_admin(self):
+        response = self.bulk([
+            {"member_id": self.admin_membership.id, "action": "revoke"},
+            {"member_id": self.users[0].id, "action": "revoke"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ProjectMember.objects.filter(project=self.project).count(), 8)
@@ -9,12 +9,14 @@ urlpatterns = [
     path("<uuid:project_id>/overview/", views.project_overview),
     path("<uuid:project_id>/verify-password/", views.verify_project_password),
     path("my-projects/", views.my_projects, name="my-projects"),
+    path("search/", views.search_projects),
     path("invitations/pending/", views.get_pending_invitations),
     path("invitations/<int:member_id>/accept/", views.accept_invitation_with_password),
     path("invitations/<int:member_id>/reject/", views.reject_invitation),
     path("<uuid:project_id>/search-users/", views.search_users_for_invitation),
     path("<uuid:project_id>/members/", views.get_project_members),
     path("<uuid:project_id>/members/<int:member_id>/revoke/", views.revoke_member_access),
+    path("<uuid:project_id>/members/bulk/", views.bulk_member_operations),
     path("<uuid:project_id>/change-access-key/", views.change_project_access_key),
     path("<uuid:project_id>/delete/", views.delete_project),
     path("<uuid:project_id>/members/<int:member_id>/role/", views.change_member_role),
@@ -1,11 +1,14 @@
 import secrets
 import string
-from datetime import timedelta
-from django.utils import timezone
-from .models import ProjectAccessSession, ProjectMember
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Lower
+from .models import Project, ProjectAccessEntry, ProjectMember
+from .permissions import invalidate_project_access
 
 SPECIAL_CHARS = "!@#$%&*"
-ACCESS_TTL_HOURS = 24
+EMAIL_LOOKUP_CHUNK_SIZE = 500
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
 
 
 def generate_project_pin(length: int = 8) -> str:
@@ -31,21 +34,17 @@ def generate_project_pin(length: int = 8) -> str:
             return pin
 
 
-def ensure_project_access(user, project, hours=ACCESS_TTL_HOURS):
-    session, created = ProjectAccessSession.objects.get_or_create(
-        user=user,
-        project=project,
-        defaults={
-            "expires_at": timezone.now() + timedelta(hours=hours)
-        }
+# Invalidates every project access token issued so far, e.g. after the
+# access key changed or a member was removed.
+def revoke_access_tokens(project_id):
+    Project.objects.filter(id=project_id).update(
+        access_generation=F("access_generation") + 1
     )
 
-    if not created:
-        if session.expires_at <= timezone.now():
-            session.expires_at = timezone.now() + timedelta(hours=hours)
-            session.save(update_fields=["expires_at"])
-
-    return session
+    for user_id in ProjectAccessEntry.objects.filter(project_id=project_id).values_list(
+        "user_id", flat=True
+    ):
+        invalidate_project_access(user_id, project_id)
 
 
 def get_admin_count(project):
@@ -53,4 +52,130 @@ def get_admin_count(project):
         project=project,
         role="admin",
         status="accepted"
-    ).count()
\ No newline at end of file
+    ).count()
+
+def refresh_member_counts(project_ids):
+    accepted = (
+        ProjectMember.objects
+        .filter(project=OuterRef("pk"), status="accepted")
+        .order_by()
+        .values("project")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+
+    Project.objects.filter(id__in=project_ids).update(
+        member_count=Coalesce(Subquery(accepted), 0)
+    )
+
+
+# Never takes the counter below zero; refresh_member_counts repairs drift.
+def adjust_member_count(project_id, delta):
+    projects = Project.objects.filter(id=project_id)
+    if delta < 0:
+        projects = projects.filter(member_count__gte=-delta)
+    projects.update(member_count=F("member_count") + delta)
+
+
+def owner_access_entry(project):
+    return ProjectAccessEntry(
+        user_id=project.root_admin_id,
+        project_id=project.id,
+        role="root_admin",
+        project_created_at=project.created_at
+    )
+
+
+def sync_member_access(member):
+    # The owner's root_admin entry is written with the project and must not
+    # be downgraded by a membership row of their own.
+    if member.user_id == member.project.root_admin_id:
+        return
+
+    if member.status != "accepted":
+        remove_member_access(member)
+        return
+
+    ProjectAccessEntry.objects.bulk_create(
+        [
+            ProjectAccessEntry(
+                user_id=member.user_id,
+                project_id=member.project_id,
+                role=member.role,
+                project_created_at=member.project.created_at
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["user", "project"],
+        update_fields=["role"]
+    )
+
+
+def remove_member_access(member):
+    ProjectAccessEntry.objects.filter(
+        user_id=member.user_id,
+        project_id=member.project_id
+    ).exclude(role="root_admin").delete()
+
+
+# For bulk write paths that bypass the membership signals.
+def rebuild_access_entries(project_ids):
+    ProjectAccessEntry.objects.filter(project_id__in=project_ids).delete()
+
+    entries = [
+        owner_access_entry(project)
+        for project in Project.objects.filter(id__in=project_ids).only("id", "root_admin_id", "created_at")
+    ]
+    entries.extend(
+        ProjectAccessEntry(
+            user_id=user_id,
+            project_id=project_id,
+            role=role,
+            project_created_at=created_at
+        )
+        for user_id, project_id, role, created_at in (
+            ProjectMember.objects
+            .filter(project_id__in=project_ids, status="accepted")
+            .values_list("user_id", "project_id", "role", "project__created_at")
+        )
+    )
+    ProjectAccessEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+# SQLite's lower() only folds ASCII letters, so roster emails are folded
+# the same way before they are matched against Lower("email").
+def fold_email(email):
+    return email.translate(ASCII_LOWER)
+
+
+# Maps fold_email()ed emails to user ids with one case-insensitive lookup per
+# chunk, served by the Lower("email") index.
+def resolve_member_emails(emails):
+    emails = list(emails)
+    user_ids = {}
+
+    for start in range(0, len(emails), EMAIL_LOOKUP_CHUNK_SIZE):
+        user_ids.update(
+            get_user_model().objects
+            .annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails[start:start + EMAIL_LOOKUP_CHUNK_SIZE])
+            .values_list("email_lower", "id")
+        )
+
+    return user_ids
+
+
+# Inserts accepted memberships of a new project in one statement. bulk_create
+# skips the membership signals, so the access entries are written here and
+# the caller sets Project.member_count.
+def add_project_members(project, members):
+    ProjectMember.objects.bulk_create(members)
+    ProjectAccessEntry.objects.bulk_create([
+        ProjectAccessEntry(
+            user_id=member.user_id,
+            project_id=project.id,
+            role=member.role,
+            project_created_at=project.created_at
+        )
+        for member in members
+    ])
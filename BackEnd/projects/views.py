@@ -4,19 +4,38 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from django.db import transaction
-from django.db.models import Q, Value, BooleanField
+from django.db.models import Value, BooleanField
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from rest_framework.throttling import ScopedRateThrottle
+from config.instrumentation import ScopedRateThrottle
 from rest_framework.decorators import throttle_classes
 
-from .models import Project, ProjectMember
+from .models import Project, ProjectMember, ProjectAccessEntry
 from .serializers import ProjectListSerializer
-from .utils import generate_project_pin, ensure_project_access
-from .pagination import parse_cursor, cursor_paginate
+from .access_tokens import ACCESS_TTL_HOURS, issue_access_token
+from .utils import (
+    generate_project_pin,
+    revoke_access_tokens,
+    fold_email,
+    resolve_member_emails,
+    add_project_members,
+)
+from .pagination import parse_cursor, parse_limit, cursor_paginate
+from .search import search_documents
+from .membership import MAX_MEMBER_OPERATIONS, MemberBatchError, apply_member_operations
+from users.directory import search_directory
+from .permissions import (
+    IsProjectMember,
+    IsProjectAdmin,
+    IsProjectOwner,
+    get_project_access,
+)
 
 DEFAULT_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+USER_SEARCH_LIMIT = 10
+MAX_MEMBERS_LIMIT = 100
 User = get_user_model()
 
 @api_view(["GET"])
@@ -90,7 +109,7 @@ joined_projects.throttle_scope = "general"
 
 
 @api_view(["GET"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectMember])
 @throttle_classes([ScopedRateThrottle])
 def project_overview(request, project_id):
     if request.path.rstrip("/").endswith(str(project_id)):
@@ -99,33 +118,16 @@ def project_overview(request, project_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin == request.user:
-        role = "root_admin"
-        is_owner = True
-    else:
-        membership = ProjectMember.objects.filter(
-            project=project,
-            user=request.user
-        ).first()
-
-        if not membership:
-            return Response(
-                {"detail": "Access denied"},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
-        role = membership.role
-        is_owner = False
+    access = get_project_access(request, project_id)
+    project = access.project
 
     return Response({
         "id": str(project.id),
         "name": project.name,
         "public_code": project.public_code,
         "created_at": project.created_at,
-        "role": role,
-        "is_owner": is_owner,
+        "role": access.role,
+        "is_owner": access.is_owner,
     })
 
 project_overview.throttle_scope = "general"
@@ -153,51 +155,60 @@ def create_project(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    valid_members = []
-    admin_count = 0
-    
+    roles = {}
     for m_data in members_list:
-        email = m_data.get("email", "").strip()
-        role = m_data.get("role", "user").lower()
-
-        if email:
-            if email.lower() == request.user.email.lower():
-                continue
-
-            target_user = User.objects.filter(email__iexact=email).first()
-            if not target_user:
-                return Response(
-                    {"detail": f"User with email '{email}' is not registered. Please invite only registered users."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            valid_members.append((target_user, role))
-            if role == "admin":
-                admin_count += 1
+        email = fold_email(m_data.get("email", "").strip())
+        role = m_data.get("role", "user")
+        role = role.lower() if isinstance(role, str) else role
+
+        if role not in ("admin", "user"):
+            return Response(
+                {"detail": f"Invalid role for {email or 'member'}. Use 'admin' or 'user'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if email and email != fold_email(request.user.email):
+            roles.setdefault(email, role)
 
-    if admin_count < 1:
+    if "admin" not in roles.values():
         return Response(
             {"detail": "At least one member must be marked as Admin"},
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    user_ids = resolve_member_emails(roles)
+    unknown = [email for email in roles if email not in user_ids]
+    if unknown:
+        return Response(
+            {
+                "detail": (
+                    f"These emails are not registered: {', '.join(unknown)}. "
+                    "Please invite only registered users."
+                ),
+                "unknown_emails": unknown,
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
     raw_pin = generate_project_pin()
 
     with transaction.atomic():
-        project = Project(name=name, root_admin=request.user)
+        project = Project(name=name, root_admin=request.user, member_count=len(roles))
         project.set_access_key(access_key)
         project.set_pin(raw_pin)
         project.save()
 
-        for target_user, role in valid_members:
-            ProjectMember.objects.get_or_create(
+        add_project_members(project, [
+            ProjectMember(
                 project=project,
-                user=target_user,
+                user_id=user_ids[email],
                 role=role,
                 status="accepted",
-                joined_at=timezone.now(),
+                joined_at=project.created_at,
                 invited_by=request.user
             )
+            for email, role in roles.items()
+        ])
 
     return Response({
         "id": str(project.id),
@@ -213,52 +224,37 @@ create_project.throttle_scope = "project_create"
 @throttle_classes([ScopedRateThrottle])
 def search_projects(request):
     q = request.query_params.get("q", "").strip()
+    limit = parse_limit(request.query_params.get("limit"), DEFAULT_LIMIT, MAX_SEARCH_LIMIT)
+    if limit is None:
+        return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
     if not q:
-        return Response({"results": []})
-
-    qs = (
-        Project.objects
-        .filter(
-            Q(root_admin=request.user) |
-            Q(projectmember__user=request.user)
-        )
-        .filter(
-            Q(name__icontains=q) |
-            Q(public_code__icontains=q)
-        )
-        .select_related("root_admin")
-        .prefetch_related("projectmember_set")
-        .distinct()
-        .order_by("-created_at")[:10]
-    )
-
-    results = []
-
-    for project in qs:
-        if project.root_admin_id == request.user.id:
-            role = "root_admin"
-            is_owner = True
-        else:
-            membership = next(
-                (
-                    m for m in project.projectmember_set.all()
-                    if m.user_id == request.user.id
-                ),
-                None
-            )
-            role = membership.role if membership else "user"
-            is_owner = False
+        return Response({"results": [], "recipes": []})
 
-        results.append({
-            "id": str(project.id),
-            "name": project.name,
-            "public_code": project.public_code,
-            "role": role,
-            "is_owner": is_owner,
-        })
+    projects = search_documents(request.user, q, "project", limit)
+    recipes = search_documents(request.user, q, "recipe", limit)
 
-    return Response({"results": results})
+    return Response({
+        "results": [
+            {
+                "id": str(project["project_id"]),
+                "name": project["project_name"],
+                "public_code": project["public_code"],
+                "role": project["role"],
+                "is_owner": project["role"] == "root_admin",
+            }
+            for project in projects
+        ],
+        "recipes": [
+            {
+                "id": int(recipe["object_id"]),
+                "name": recipe["name"],
+                "project_id": str(recipe["project_id"]),
+                "project_name": recipe["project_name"],
+            }
+            for recipe in recipes
+        ],
+    })
 
 search_projects.throttle_scope = "general"
 
@@ -270,22 +266,25 @@ def my_projects(request):
     limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
 
     qs = (
-        Project.objects
-        .filter(
-            Q(root_admin=request.user) |
-            Q(projectmember__user=request.user)
-        )
-        .distinct()
+        ProjectAccessEntry.objects
+        .filter(user=request.user)
+        .values("id", "project_id", "project__name", "role", "project_created_at")
     )
 
-    projects, has_more, next_cursor = cursor_paginate(qs, cursor, limit)
+    entries, has_more, next_cursor = cursor_paginate(
+        qs,
+        cursor,
+        limit,
+        date_field="project_created_at"
+    )
 
     results = [
         {
-            "id": str(p.id),
-            "name": p.name,
+            "id": str(entry["project_id"]),
+            "name": entry["project__name"],
+            "role": entry["role"],
         }
-        for p in projects
+        for entry in entries
     ]
 
     return Response({
@@ -298,16 +297,10 @@ my_projects.throttle_scope = "general"
 
 
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def delete_project(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only the project owner can delete this project"},
-            status=status.HTTP_403_FORBIDDEN
-        )
+    project = get_project_access(request, project_id).project
 
     pin = request.data.get("pin", "").strip()
     
@@ -334,41 +327,27 @@ def delete_project(request, project_id):
 delete_project.throttle_scope = "general"
 
 @api_view(["GET"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def search_users_for_invitation(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only the project owner can invite members"},
-            status=status.HTTP_403_FORBIDDEN
-        )
-    
     email = request.query_params.get("email", "").strip()
     
     if len(email) < 3:
         return Response({"results": []})
 
-    existing_members = ProjectMember.objects.filter(
-        project=project,
-        status="accepted"
-    ).values_list('user_id', flat=True)
-    
-    users = User.objects.filter(
-        email__icontains=email
-    ).exclude(
-        id__in=existing_members
-    ).exclude(
-        id=request.user.id
-    )[:10]
-    
+    # The directory results are shared by everyone inviting to this
+    # project, so the requester is dropped here rather than in SQL.
+    users = [
+        user for user in search_directory(project_id, email, USER_SEARCH_LIMIT + 1)
+        if user["id"] != request.user.id
+    ][:USER_SEARCH_LIMIT]
+
     results = []
     for user in users:
         results.append({
-            "id": str(user.id),
-            "email": user.email,
-            "first_name": user.full_name,
+            "id": str(user["id"]),
+            "email": user["email"],
+            "first_name": user["full_name"],
             "last_name": "",
         })
 
@@ -377,25 +356,23 @@ def search_users_for_invitation(request, project_id):
 search_users_for_invitation.throttle_scope = "general"
 
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def send_project_invitation(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only root admin can invite users"},
-            status=status.HTTP_403_FORBIDDEN
-        )
-
     user_id = request.data.get("user_id")
     if not user_id:
         return Response({"detail": "user_id is required"}, status=400)
 
     invited_user = get_object_or_404(User, id=user_id)
 
+    if invited_user.id == get_project_access(request, project_id).project.root_admin_id:
+        return Response(
+            {"detail": "The project owner cannot be invited"},
+            status=400
+        )
+
     member = ProjectMember.objects.filter(
-        project=project,
+        project_id=project_id,
         user=invited_user
     ).first()
 
@@ -418,7 +395,7 @@ def send_project_invitation(request, project_id):
         member.save()
     else:
         ProjectMember.objects.create(
-            project=project,
+            project_id=project_id,
             user=invited_user,
             role="user",
             status="pending",
@@ -481,14 +458,14 @@ def accept_invitation_with_password(request, member_id):
     member.joined_at = timezone.now()
     member.save()
 
-    ensure_project_access(request.user, member.project)
-
     return Response({
         "detail": "Invitation accepted",
         "project": {
             "id": str(member.project.id),
             "name": member.project.name
-        }
+        },
+        "access_token": issue_access_token(request.user, member.project),
+        "expires_in_hours": ACCESS_TTL_HOURS
     }, status=status.HTTP_200_OK)
 
 accept_invitation_with_password.throttle_scope = "invite_accept"
@@ -515,86 +492,65 @@ reject_invitation.throttle_scope = "invite_reject"
 
 
 @api_view(["GET"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectAdmin])
 @throttle_classes([ScopedRateThrottle])
 def get_project_members(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
+    project = get_project_access(request, project_id).project
 
-    is_admin = (
-        project.root_admin_id == request.user.id or
-        ProjectMember.objects.filter(
-            project=project,
-            user=request.user,
-            role="admin",
-            status="accepted"
-        ).exists()
-    )
-
-    if not is_admin:
-        return Response(
-            {"detail": "Access denied"},
-            status=status.HTTP_403_FORBIDDEN
-        )
-
-    limit = int(request.query_params.get("limit", 10))
-    offset = int(request.query_params.get("offset", 0))
+    cursor = parse_cursor(request.query_params.get("cursor"))
+    limit = max(2, min(int(request.query_params.get("limit", 10)), MAX_MEMBERS_LIMIT))
 
-    members_list = []
+    results = []
 
-    root_admin = project.root_admin
-    members_list.append({
-        "id": 0,
-        "user_id": str(root_admin.id),
-        "email": root_admin.email,
-        "name": root_admin.full_name,
-        "role": "root_admin",
-    })
+    # The root admin has no membership row; it heads the first page.
+    if cursor is None:
+        root_admin = User.objects.values("id", "email", "full_name").get(id=project.root_admin_id)
+        results.append({
+            "id": 0,
+            "user_id": str(root_admin["id"]),
+            "email": root_admin["email"],
+            "name": root_admin["full_name"],
+            "role": "root_admin",
+        })
 
-    accepted_members = (
+    members, has_more, next_cursor = cursor_paginate(
         ProjectMember.objects
         .filter(project=project, status="accepted")
-        .select_related("user")
-        .order_by("joined_at")
+        .values("id", "role", "joined_at", "user_id", "user__email", "user__full_name"),
+        cursor,
+        limit - len(results),
+        date_field="joined_at",
+        descending=False
     )
 
-    for member in accepted_members:
-        user = member.user
-
-        members_list.append({
-            "id": member.id,
-            "user_id": str(user.id),
-            "email": user.email,
-            "name": user.full_name,
-            "role": member.role,
+    for member in members:
+        results.append({
+            "id": member["id"],
+            "user_id": str(member["user_id"]),
+            "email": member["user__email"],
+            "name": member["user__full_name"],
+            "role": member["role"],
         })
 
-    total_count = len(members_list)
-    paginated_members = members_list[offset: offset + limit]
-
     return Response({
-        "count": total_count,
+        "count": project.member_count + 1,
         "limit": limit,
-        "offset": offset,
-        "results": paginated_members,
+        "results": results,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     })
 
 get_project_members.throttle_scope = "general"
 
 
 @api_view(["DELETE"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def revoke_member_access(request, project_id, member_id):
-    project = get_object_or_404(Project, id=project_id)
+    project = get_project_access(request, project_id).project
     member = get_object_or_404(ProjectMember, id=member_id, project=project)
 
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only project owner can revoke access"},
-            status=status.HTTP_403_FORBIDDEN
-        )
-
-    if member.user == project.root_admin:
+    if member.user_id == project.root_admin_id:
         return Response(
             {"detail": "Cannot remove project owner"},
             status=status.HTTP_400_BAD_REQUEST
@@ -621,6 +577,7 @@ def revoke_member_access(request, project_id, member_id):
     
     member_email = member.user.email
     member.delete()
+    revoke_access_tokens(project.id)
     
     return Response({
         "detail": f"Access revoked for {member_email}"
@@ -630,16 +587,10 @@ revoke_member_access.throttle_scope = "general"
 
 
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def regenerate_project_pin(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only project owner can regenerate PIN"},
-            status=status.HTTP_403_FORBIDDEN
-        )
+    project = get_project_access(request, project_id).project
 
     new_pin = generate_project_pin()
 
@@ -658,16 +609,10 @@ regenerate_project_pin.throttle_scope = "general"
 
 
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def change_project_access_key(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response(
-            {"detail": "Only project owner can change access key"},
-            status=status.HTTP_403_FORBIDDEN
-        )
+    project = get_project_access(request, project_id).project
 
     new_access_key = request.data.get("new_access_key", "").strip()
 
@@ -685,6 +630,7 @@ def change_project_access_key(request, project_id):
 
     project.set_access_key(new_access_key)
     project.save(update_fields=["access_key_hash"])
+    revoke_access_tokens(project.id)
 
     return Response(
         {"detail": "Project access key updated successfully"},
@@ -707,29 +653,23 @@ def verify_project_password(request, project_id):
     if not project.check_access_key(password):
         return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    ensure_project_access(request.user, project)
-
     return Response({
         "detail": "Access granted",
-        "expires_in_hours": 24
+        "access_token": issue_access_token(request.user, project),
+        "expires_in_hours": ACCESS_TTL_HOURS
     }, status=status.HTTP_200_OK)
 
 verify_project_password.throttle_scope = "general"
 
 
 @api_view(["PATCH"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsProjectOwner])
 @throttle_classes([ScopedRateThrottle])
 def change_member_role(request, project_id, member_id):
-    project = get_object_or_404(Project, id=project_id)
-
-    if project.root_admin != request.user:
-        return Response({"detail": "Forbidden"}, status=403)
-
     member = get_object_or_404(
         ProjectMember,
         id=member_id,
-        project=project,
+        project_id=project_id,
         status="accepted"
     )
 
@@ -740,7 +680,7 @@ def change_member_role(request, project_id, member_id):
     
     if member.role == "admin" and new_role == "user":
         admin_count = ProjectMember.objects.filter(
-            project=project,
+            project_id=project_id,
             role="admin",
             status="accepted"
         ).count()
@@ -765,4 +705,33 @@ def change_member_role(request, project_id, member_id):
         "role": member.role
     })
 
-change_member_role.throttle_scope = "role_change"
\ No newline at end of file
+change_member_role.throttle_scope = "role_change"
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsProjectOwner])
+@throttle_classes([ScopedRateThrottle])
+def bulk_member_operations(request, project_id):
+    project = get_project_access(request, project_id).project
+    operations = request.data.get("operations")
+
+    if not isinstance(operations, list) or not operations:
+        return Response(
+            {"detail": "operations must be a non-empty list"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if len(operations) > MAX_MEMBER_OPERATIONS:
+        return Response(
+            {"detail": f"At most {MAX_MEMBER_OPERATIONS} operations are allowed per request"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        with transaction.atomic():
+            results = apply_member_operations(project, operations)
+    except MemberBatchError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({"results": results})
+
+bulk_member_operations.throttle_scope = "role_change"
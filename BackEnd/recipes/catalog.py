@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+from .models import Tag, Combination, CatalogVersion
+from .serializers import TagSerializer, CombinationSerializer
+
+CATALOG_VERSION_ID = 1
+
+# Rendered bodies are keyed by version, so the timeout only bounds memory.
+CATALOG_CACHE_TIMEOUT = 300
+
+
+def get_catalog_version():
+    version = (
+        CatalogVersion.objects
+        .filter(id=CATALOG_VERSION_ID)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def bump_catalog_version():
+    updated = CatalogVersion.objects.filter(id=CATALOG_VERSION_ID).update(
+        version=F("version") + 1
+    )
+    if not updated:
+        CatalogVersion.objects.get_or_create(id=CATALOG_VERSION_ID)
+
+
+def render_tags():
+    return TagSerializer(Tag.objects.all(), many=True).data
+
+
+def render_combinations():
+    combinations = Combination.objects.prefetch_related("tag_values__tag")
+    return CombinationSerializer(combinations, many=True).data
+
+
+def catalog_response(request, name, render):
+    version = get_catalog_version()
+    etag = f'"{name}-{version}"'
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        body_key = f"recipes:catalog:{name}:{version}"
+        body = cache.get(body_key)
+
+        if body is None:
+            body = JSONRenderer().render(render())
+            cache.set(body_key, body, CATALOG_CACHE_TIMEOUT)
+
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
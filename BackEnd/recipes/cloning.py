@@ -0,0 +1,56 @@
+from .models import Recipe, RecipeCombination, RecipeCombinationTagValue
+from .versioning import record_recipe_version
+
+CLONE_CHUNK_SIZE = 2000
+
+
+# Copies the combination tree with one read and one bulk insert per table
+# (the tag values in keyset chunks), never materialising the nested payload.
+def clone_recipe(recipe, project_id, name):
+    clone = Recipe.objects.create(
+        name=name,
+        project_id=project_id,
+        version=1
+    )
+
+    source_combinations = list(
+        RecipeCombination.objects
+        .filter(recipe=recipe)
+        .values_list("id", "combination_id", "order")
+    )
+    created = RecipeCombination.objects.bulk_create([
+        RecipeCombination(recipe=clone, combination_id=combination_id, order=order)
+        for _, combination_id, order in source_combinations
+    ])
+    new_ids = {
+        source_id: recipe_combination.id
+        for (source_id, _, _), recipe_combination in zip(source_combinations, created)
+    }
+
+    # Keyset chunks rather than .iterator(): each read finishes before its
+    # insert, so no cursor is left open on the table being written.
+    last_id = 0
+    while True:
+        chunk = list(
+            RecipeCombinationTagValue.objects
+            .filter(recipe_combination__recipe=recipe, id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "recipe_combination_id", "tag_id", "value")[:CLONE_CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        RecipeCombinationTagValue.objects.bulk_create([
+            RecipeCombinationTagValue(
+                recipe_combination_id=new_ids[recipe_combination_id],
+                tag_id=tag_id,
+                value=value
+            )
+            for _, recipe_combination_id, tag_id, value in chunk
+        ])
+        if len(chunk) < CLONE_CHUNK_SIZE:
+            break
+        last_id = chunk[-1][0]
+
+    record_recipe_version(clone)
+
+    return clone
@@ -0,0 +1,140 @@
+from projects.search import index_recipes
+from .models import Recipe, RecipeCombination, RecipeCombinationTagValue
+from .versioning import bump_recipe_version, ensure_recipe_version
+
+
+class RecipeDeltaError(Exception):
+    pass
+
+
+def plan_orders(current, delta):
+    removed = set(delta["remove"])
+    kept = [
+        combination_id
+        for combination_id, _ in sorted(current.items(), key=lambda item: (item[1][1], item[1][0]))
+        if combination_id not in removed
+    ]
+    added = [combo["id"] for combo in delta["add"]]
+
+    if "order" not in delta:
+        # Existing rows keep their position; new ones go to the end.
+        start = max((order for _, order in current.values()), default=-1) + 1
+        orders = {combination_id: current[combination_id][1] for combination_id in kept}
+        orders.update({combination_id: start + idx for idx, combination_id in enumerate(added)})
+        return orders
+
+    if sorted(delta["order"]) != sorted(kept + added):
+        raise RecipeDeltaError("order must list every combination of the recipe exactly once")
+
+    return {combination_id: idx for idx, combination_id in enumerate(delta["order"])}
+
+
+# Applies an add/update/remove/reorder delta touching only the rows that
+# change. Returns False when the delta is a no-op, in which case the
+# version is left alone.
+def apply_recipe_delta(recipe, delta):
+    current = {
+        combination_id: (recipe_combination_id, order)
+        for recipe_combination_id, combination_id, order in (
+            RecipeCombination.objects
+            .filter(recipe=recipe)
+            .values_list("id", "combination_id", "order")
+        )
+    }
+
+    for combination_id in delta["remove"] + [entry["id"] for entry in delta["update"]]:
+        if combination_id not in current:
+            raise RecipeDeltaError(f"Combination {combination_id} is not in this recipe")
+    for combo in delta["add"]:
+        if combo["id"] in current:
+            raise RecipeDeltaError(f"Combination {combo['id']} is already in this recipe")
+
+    orders = plan_orders(current, delta)
+
+    existing = {}
+    updated_ids = [current[entry["id"]][0] for entry in delta["update"]]
+    if updated_ids:
+        existing = {
+            (recipe_combination_id, tag_id): (tag_value_id, value)
+            for tag_value_id, recipe_combination_id, tag_id, value in (
+                RecipeCombinationTagValue.objects
+                .filter(recipe_combination_id__in=updated_ids)
+                .values_list("id", "recipe_combination_id", "tag_id", "value")
+            )
+        }
+
+    changed_values = []
+    new_values = []
+    removed_values = []
+    for entry in delta["update"]:
+        recipe_combination_id = current[entry["id"]][0]
+
+        for tag_value in entry["tag_values"]:
+            key = (recipe_combination_id, tag_value["tag_id"])
+            if key not in existing:
+                new_values.append(RecipeCombinationTagValue(
+                    recipe_combination_id=recipe_combination_id,
+                    tag_id=tag_value["tag_id"],
+                    value=tag_value["value"]
+                ))
+            elif existing[key][1] != tag_value["value"]:
+                changed_values.append(RecipeCombinationTagValue(
+                    id=existing[key][0],
+                    value=tag_value["value"]
+                ))
+
+        for tag_id in entry["remove_tags"]:
+            key = (recipe_combination_id, tag_id)
+            if key in existing:
+                removed_values.append(existing[key][0])
+
+    reordered = [
+        RecipeCombination(id=recipe_combination_id, order=orders[combination_id])
+        for combination_id, (recipe_combination_id, order) in current.items()
+        if combination_id in orders and orders[combination_id] != order
+    ]
+    removed_combinations = [current[combination_id][0] for combination_id in delta["remove"]]
+    renamed = "name" in delta and delta["name"] != recipe.name
+
+    if not any([
+        renamed, delta["add"], removed_combinations, reordered,
+        changed_values, new_values, removed_values,
+    ]):
+        return False
+
+    ensure_recipe_version(recipe)
+
+    if renamed:
+        Recipe.objects.filter(id=recipe.id).update(name=delta["name"])
+        recipe.name = delta["name"]
+        index_recipes([recipe])
+
+    if removed_values:
+        RecipeCombinationTagValue.objects.filter(id__in=removed_values).delete()
+    if removed_combinations:
+        RecipeCombination.objects.filter(id__in=removed_combinations).delete()
+
+    if reordered:
+        RecipeCombination.objects.bulk_update(reordered, ["order"])
+    if changed_values:
+        RecipeCombinationTagValue.objects.bulk_update(changed_values, ["value"])
+
+    if delta["add"]:
+        added = RecipeCombination.objects.bulk_create([
+            RecipeCombination(recipe=recipe, combination_id=combo["id"], order=orders[combo["id"]])
+            for combo in delta["add"]
+        ])
+        new_values.extend(
+            RecipeCombinationTagValue(
+                recipe_combination=recipe_combination,
+                tag_id=tag_value["tag_id"],
+                value=tag_value["value"]
+            )
+            for recipe_combination, combo in zip(added, delta["add"])
+            for tag_value in combo["tag_values"]
+        )
+    if new_values:
+        RecipeCombinationTagValue.objects.bulk_create(new_values)
+
+    bump_recipe_version(recipe)
+    return True
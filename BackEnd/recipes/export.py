@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .resolver import resolve_recipes
+
+EXPORT_CHUNK_SIZE = 200
+
+CSV_COLUMNS = [
+    "recipe_id",
+    "recipe_name",
+    "version",
+    "combination_id",
+    "combination",
+    "order",
+    "tag_id",
+    "tag",
+    "value",
+    "source",
+]
+
+
+# Keyset-ordered chunk queries: no server-side cursor stays open while the
+# resolve queries run or while the response is being streamed.
+def iter_resolved_recipes(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    last_id = 0
+
+    while True:
+        chunk = list(
+            queryset
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .values("id", "name", "version", "created_at", "updated_at")[:chunk_size]
+        )
+        if not chunk:
+            return
+
+        resolved = resolve_recipes([recipe["id"] for recipe in chunk])
+        for recipe in chunk:
+            yield recipe, resolved[recipe["id"]]
+
+        last_id = chunk[-1]["id"]
+
+
+def stream_ndjson(queryset):
+    for recipe, combinations in iter_resolved_recipes(queryset):
+        yield json.dumps(
+            {**recipe, "combinations": combinations},
+            cls=DjangoJSONEncoder,
+            separators=(",", ":")
+        ) + "\n"
+
+
+def stream_csv(queryset):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    for recipe, combinations in iter_resolved_recipes(queryset):
+        for combo in combinations:
+            for tag_value in combo["tag_values"]:
+                writer.writerow([
+                    recipe["id"],
+                    recipe["name"],
+                    recipe["version"],
+                    combo["combination_id"],
+                    combo["name"],
+                    combo["order"],
+                    tag_value["tag_id"],
+                    tag_value["name"],
+                    tag_value["value"],
+                    tag_value["source"],
+                ])
+        yield flush()
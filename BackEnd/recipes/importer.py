@@ -0,0 +1,275 @@
+import csv
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection, transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from projects.search import index_recipes
+from .models import Recipe, RecipeImportJob
+from .serializers import RecipeCreateSerializer
+from .utils import load_catalog_ids, catalog_errors, bulk_create_recipe_combinations
+from .versioning import record_recipe_versions
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 200
+MAX_IMPORT_ROWS = 10000
+IMPORT_STALE_AFTER = timedelta(minutes=15)
+
+# Jobs run in this process only and are not resumed: if the process exits
+# while a job is pending or running, the job stops making progress. Nothing
+# sweeps for such jobs; fail_if_stale marks one failed when its status is
+# read (RecipeImportJobView) after IMPORT_STALE_AFTER without an update.
+# The file has to be imported again.
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recipe-import")
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def parse_import_csv(text):
+    recipes = {}
+    reader = csv.DictReader(io.StringIO(text))
+
+    required = {"recipe_name", "combination_id", "tag_id", "value"}
+    if not required.issubset(reader.fieldnames or []):
+        raise ImportFileError(
+            f"CSV must have the columns {', '.join(sorted(required))}"
+        )
+
+    for row in reader:
+        recipe = recipes.setdefault(
+            row["recipe_name"],
+            {"name": row["recipe_name"], "combinations": {}}
+        )
+        combo = recipe["combinations"].setdefault(
+            row["combination_id"],
+            {"id": row["combination_id"], "tag_values": []}
+        )
+        combo["tag_values"].append({"tag_id": row["tag_id"], "value": row["value"]})
+
+    return [
+        {"name": recipe["name"], "combinations": list(recipe["combinations"].values())}
+        for recipe in recipes.values()
+    ]
+
+
+def parse_import_data(request):
+    if not isinstance(request.data, dict):
+        raise ImportFileError("Request body must be an object with a recipes list")
+
+    upload = request.FILES.get("file")
+
+    if upload is None:
+        recipes = request.data.get("recipes")
+    else:
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ImportFileError("File must be UTF-8 encoded")
+
+        if upload.name.lower().endswith(".csv"):
+            recipes = parse_import_csv(text)
+        else:
+            try:
+                recipes = json.loads(text)
+            except ValueError:
+                raise ImportFileError("File is not valid JSON")
+
+            if isinstance(recipes, dict):
+                recipes = recipes.get("recipes")
+
+    if not isinstance(recipes, list) or not recipes:
+        raise ImportFileError("No recipes to import")
+
+    if len(recipes) > MAX_IMPORT_ROWS:
+        raise ImportFileError(f"At most {MAX_IMPORT_ROWS} recipes per import")
+
+    return recipes
+
+
+def validate_import(project_id, rows):
+    valid = []
+    errors = []
+
+    seen_names = set()
+    for idx, row in enumerate(rows):
+        serializer = RecipeCreateSerializer(
+            data=row,
+            context={"check_catalog": False}
+        )
+        if not serializer.is_valid():
+            errors.append({
+                "row": idx,
+                "name": row.get("name") if isinstance(row, dict) else None,
+                "errors": serializer.errors,
+            })
+            continue
+
+        name = serializer.validated_data["name"]
+        if name in seen_names:
+            errors.append({
+                "row": idx,
+                "name": name,
+                "errors": ["Duplicate recipe name in file"],
+            })
+            continue
+        seen_names.add(name)
+
+        valid.append((idx, serializer.validated_data))
+
+    known_combinations, known_tags = load_catalog_ids(
+        data["combinations"] for _, data in valid
+    )
+    existing_names = set(
+        Recipe.objects
+        .filter(project_id=project_id, name__in=seen_names)
+        .values_list("name", flat=True)
+    )
+
+    checked = []
+    for idx, data in valid:
+        row_errors = catalog_errors(data["combinations"], known_combinations, known_tags)
+        if data["name"] in existing_names:
+            row_errors.append("Recipe with this name already exists")
+
+        if row_errors:
+            errors.append({"row": idx, "name": data["name"], "errors": row_errors})
+        else:
+            checked.append((idx, data))
+
+    return checked, errors
+
+
+def insert_import_chunk(project_id, chunk):
+    with transaction.atomic():
+        recipes = Recipe.objects.bulk_create([
+            Recipe(name=data["name"], project_id=project_id, version=1)
+            for _, data in chunk
+        ])
+        bulk_create_recipe_combinations([
+            (recipe, data["combinations"])
+            for recipe, (_, data) in zip(recipes, chunk)
+        ])
+        record_recipe_versions(recipes)
+        index_recipes(recipes)
+
+
+# Retries a chunk that failed as a whole one recipe at a time, so a single
+# conflicting row only fails itself.
+def insert_import_rows(project_id, chunk, errors):
+    created = 0
+
+    for idx, data in chunk:
+        try:
+            insert_import_chunk(project_id, [(idx, data)])
+            created += 1
+        except IntegrityError:
+            # A recipe with this name was created meanwhile.
+            errors.append({
+                "row": idx,
+                "name": data["name"],
+                "errors": ["Recipe name conflict during insert"],
+            })
+
+    return created
+
+
+def update_import_job(job_id, **fields):
+    return RecipeImportJob.objects.filter(id=job_id).update(
+        updated_at=timezone.now(),
+        **fields
+    )
+
+
+def run_import_job(job_id, rows):
+    job = RecipeImportJob.objects.get(id=job_id)
+
+    try:
+        # Jobs already marked stale are not picked up again.
+        if not RecipeImportJob.objects.filter(id=job_id, status="pending").update(
+            status="running",
+            updated_at=timezone.now()
+        ):
+            return
+
+        checked, errors = validate_import(job.project_id, rows)
+        update_import_job(job_id, processed_rows=len(errors), errors=errors)
+
+        for start in range(0, len(checked), IMPORT_CHUNK_SIZE):
+            chunk = checked[start:start + IMPORT_CHUNK_SIZE]
+
+            try:
+                insert_import_chunk(job.project_id, chunk)
+                created = len(chunk)
+            except IntegrityError:
+                created = insert_import_rows(job.project_id, chunk, errors)
+
+            update_import_job(
+                job_id,
+                processed_rows=F("processed_rows") + len(chunk),
+                created_count=F("created_count") + created,
+                errors=errors
+            )
+
+        update_import_job(job_id, status="completed", finished_at=timezone.now())
+    except Exception:
+        logger.exception("Recipe import %s failed", job_id)
+        update_import_job(job_id, status="failed", finished_at=timezone.now())
+
+
+def fail_if_stale(job):
+    now = timezone.now()
+    if job.status not in ("pending", "running") or job.updated_at >= now - IMPORT_STALE_AFTER:
+        return job
+
+    errors = job.errors + [{"errors": ["Import was interrupted; please import the file again"]}]
+    # Conditional on updated_at so a job that is still progressing wins.
+    if RecipeImportJob.objects.filter(id=job.id, updated_at=job.updated_at).update(
+        status="failed",
+        errors=errors,
+        updated_at=now,
+        finished_at=now
+    ):
+        logger.warning("Recipe import %s was interrupted", job.id)
+
+    job.refresh_from_db()
+    return job
+
+
+def run_import_job_in_background(job_id, rows):
+    try:
+        run_import_job(job_id, rows)
+    finally:
+        connection.close()
+
+
+def start_import_job(project_id, user, rows):
+    job = RecipeImportJob.objects.create(
+        project_id=project_id,
+        created_by=user,
+        total_rows=len(rows)
+    )
+
+    transaction.on_commit(lambda: executor.submit(run_import_job_in_background, job.id, rows))
+
+    return job
+
+
+def serialize_import_job(job):
+    return {
+        "id": str(job.id),
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "created_count": job.created_count,
+        "errors": job.errors,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
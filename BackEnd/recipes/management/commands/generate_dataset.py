@@ -0,0 +1,244 @@
+import random
+import time
+import uuid
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import Project, ProjectMember
+from projects.search import index_projects, index_recipes
+from projects.utils import refresh_member_counts, rebuild_access_entries
+from recipes.models import (
+    CombinationTag,
+    Recipe,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+)
+from recipes.versioning import record_recipe_versions
+from users.directory import index_users
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = "benchmark-pass-123"
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic dataset for load tests and benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument("--members-per-project", type=int, default=20)
+        parser.add_argument("--recipes-per-project", type=int, default=50)
+        parser.add_argument("--combinations-per-recipe", type=int, default=3)
+        parser.add_argument("--overrides-per-combination", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--prefix",
+            default="gen",
+            help="Prefix for generated names and emails, so datasets can coexist"
+        )
+
+    def handle(self, *args, **options):
+        # Every project needs a user to own it.
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+
+        self.rng = random.Random(f"{options['prefix']}:{options['seed']}")
+        self.chunk_size = options["chunk_size"]
+        self.prefix = options["prefix"]
+        self.options = options
+
+        call_command("seed_base_data", stdout=self.stdout)
+
+        # Hashing is the slow part of creating users and projects; every
+        # generated row shares one precomputed hash.
+        self.password_hash = make_password(DEFAULT_PASSWORD)
+
+        started = time.monotonic()
+
+        user_ids = self.stage("users", self.create_users)
+        projects = self.stage("projects", self.create_projects, user_ids)
+        self.stage("memberships", self.create_memberships, projects, user_ids)
+        self.stage("recipes", self.create_recipes, projects)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Dataset generated in {time.monotonic() - started:.1f}s"
+        ))
+
+    def stage(self, label, func, *args):
+        self.stdout.write(f"Generating {label}...")
+        started = time.monotonic()
+        result = func(*args)
+        self.stdout.write(f"  {label}: {time.monotonic() - started:.1f}s")
+        return result
+
+    def create_users(self):
+        user_ids = []
+        users = (
+            User(
+                email=f"{self.prefix}-user-{idx}@example.com",
+                full_name=f"{self.prefix.title()} User {idx}",
+                password=self.password_hash,
+            )
+            for idx in range(self.options["users"])
+        )
+
+        for chunk in chunked(users, self.chunk_size):
+            with transaction.atomic():
+                created = User.objects.bulk_create(chunk)
+                index_users(created)
+            user_ids.extend(user.id for user in created)
+
+        return user_ids
+
+    def public_codes(self, count):
+        codes = []
+        seen = set()
+        while len(codes) < count:
+            candidates = [
+                f"APSQ-{self.rng.getrandbits(32):08X}"
+                for _ in range(count - len(codes))
+            ]
+            taken = set(
+                Project.objects
+                .filter(public_code__in=candidates)
+                .values_list("public_code", flat=True)
+            )
+            for code in candidates:
+                if code not in taken and code not in seen:
+                    seen.add(code)
+                    codes.append(code)
+        return codes
+
+    def create_projects(self, user_ids):
+        projects = []
+
+        for chunk in chunked(range(self.options["projects"]), self.chunk_size):
+            codes = self.public_codes(len(chunk))
+            batch = [
+                Project(
+                    id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                    name=f"{self.prefix.title()} Project {idx}",
+                    public_code=code,
+                    root_admin_id=self.rng.choice(user_ids),
+                    access_key_hash=self.password_hash,
+                    pin_hash=self.password_hash,
+                )
+                for idx, code in zip(chunk, codes)
+            ]
+
+            with transaction.atomic():
+                Project.objects.bulk_create(batch)
+                index_projects(batch)
+
+            projects.extend((project.id, project.root_admin_id) for project in batch)
+
+        return projects
+
+    def create_memberships(self, projects, user_ids):
+        now = timezone.now()
+        per_project = min(self.options["members_per_project"], len(user_ids) - 1)
+
+        def memberships():
+            for project_id, owner_id in projects:
+                candidates = self.rng.sample(user_ids, per_project + 1)
+                members = [user_id for user_id in candidates if user_id != owner_id]
+
+                for idx, user_id in enumerate(members[:per_project]):
+                    # The first member is always an accepted admin, as
+                    # create_project requires.
+                    if idx == 0:
+                        role, status = "admin", "accepted"
+                    else:
+                        role = "admin" if self.rng.random() < 0.2 else "user"
+                        status = self.rng.choices(
+                            ["accepted", "pending", "rejected"],
+                            weights=[80, 15, 5]
+                        )[0]
+
+                    yield ProjectMember(
+                        project_id=project_id,
+                        user_id=user_id,
+                        role=role,
+                        status=status,
+                        invited_by_id=owner_id,
+                        invited_at=now,
+                        joined_at=now if status == "accepted" else None,
+                    )
+
+        for chunk in chunked(memberships(), self.chunk_size):
+            with transaction.atomic():
+                ProjectMember.objects.bulk_create(chunk)
+
+        for chunk in chunked([project_id for project_id, _ in projects], self.chunk_size):
+            with transaction.atomic():
+                refresh_member_counts(chunk)
+                rebuild_access_entries(chunk)
+
+    def create_recipes(self, projects):
+        combination_tags = {}
+        for combination_id, tag_id in CombinationTag.objects.values_list("combination_id", "tag_id"):
+            combination_tags.setdefault(combination_id, []).append(tag_id)
+        combination_ids = sorted(combination_tags)
+
+        per_recipe = min(self.options["combinations_per_recipe"], len(combination_ids))
+        overrides = self.options["overrides_per_combination"]
+
+        recipes = (
+            (project_id, f"Recipe {idx}")
+            for project_id, _ in projects
+            for idx in range(self.options["recipes_per_project"])
+        )
+
+        recipe_chunk = max(1, self.chunk_size // max(1, per_recipe * max(1, overrides)))
+
+        for chunk in chunked(recipes, recipe_chunk):
+            with transaction.atomic():
+                created = Recipe.objects.bulk_create([
+                    Recipe(name=name, project_id=project_id, version=1)
+                    for project_id, name in chunk
+                ])
+
+                pairs = [
+                    (recipe, combination_id, order)
+                    for recipe in created
+                    for order, combination_id in enumerate(
+                        self.rng.sample(combination_ids, per_recipe)
+                    )
+                ]
+                recipe_combinations = RecipeCombination.objects.bulk_create([
+                    RecipeCombination(recipe=recipe, combination_id=combination_id, order=order)
+                    for recipe, combination_id, order in pairs
+                ])
+
+                RecipeCombinationTagValue.objects.bulk_create([
+                    RecipeCombinationTagValue(
+                        recipe_combination=recipe_combination,
+                        tag_id=tag_id,
+                        value=round(self.rng.uniform(0, 100), 2),
+                    )
+                    for recipe_combination in recipe_combinations
+                    for tag_id in self.rng.sample(
+                        combination_tags[recipe_combination.combination_id],
+                        min(overrides, len(combination_tags[recipe_combination.combination_id]))
+                    )
+                ])
+
+                record_recipe_versions(created)
+                index_recipes(created)
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from recipes.catalog import bump_catalog_version
 from recipes.models import Tag, Combination, CombinationTag
 
 
@@ -8,32 +9,45 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         self.stdout.write("Seeding tags...")
 
-        tags = []
-        for i in range(1, 101):
-            tag, _ = Tag.objects.get_or_create(
-                name=f"Tag{i}",
-                defaults={"default_value": 0}
-            )
-            tags.append(tag)
+        tag_names = [f"Tag{i}" for i in range(1, 101)]
+        Tag.objects.bulk_create(
+            [Tag(name=name, default_value=0) for name in tag_names],
+            ignore_conflicts=True
+        )
+        tag_ids = dict(
+            Tag.objects
+            .filter(name__in=tag_names)
+            .values_list("name", "id")
+        )
 
         self.stdout.write("Seeding combinations...")
 
-        for i in range(1, 11):
-            combo, created = Combination.objects.get_or_create(
-                name=f"C{i}"
+        combination_names = [f"C{i}" for i in range(1, 11)]
+        existing = set(
+            Combination.objects
+            .filter(name__in=combination_names)
+            .values_list("name", flat=True)
+        )
+        created = Combination.objects.bulk_create([
+            Combination(name=name)
+            for name in combination_names
+            if name not in existing
+        ])
+
+        CombinationTag.objects.bulk_create([
+            CombinationTag(
+                combination=combo,
+                tag_id=tag_ids[name],
+                value=0
             )
-
-            if not created:
-                continue
-
-            start = (i - 1) * 10
-            end = start + 10
-
-            for tag in tags[start:end]:
-                CombinationTag.objects.create(
-                    combination=combo,
-                    tag=tag,
-                    value=0
-                )
+            for combo in created
+            for name in tag_names[
+                (int(combo.name[1:]) - 1) * 10:int(combo.name[1:]) * 10
+            ]
+        ])
+
+        # bulk_create skips the catalog signals. Only new combinations get
+        # defaults here, and no recipe can use them yet.
+        bump_catalog_version()
 
         self.stdout.write(self.style.SUCCESS("Base data seeded successfully"))
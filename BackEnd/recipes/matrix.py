@@ -0,0 +1,135 @@
+import io
+import json
+import struct
+from collections import defaultdict
+
+import numpy as np
+
+from .models import (
+    Recipe,
+    Tag,
+    Combination,
+    CombinationTag,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+)
+
+MATRIX_CONTENT_TYPE = "application/x-recipe-matrix"
+
+
+def build_project_matrix(project_id, include_archived=False):
+    archived = {} if include_archived else {"is_archived": False}
+
+    recipes = list(
+        Recipe.objects
+        .filter(project_id=project_id, **archived)
+        .order_by("id")
+        .values_list("id", "name")
+    )
+    row_index = {recipe_id: idx for idx, (recipe_id, _) in enumerate(recipes)}
+
+    recipe_combinations = list(
+        RecipeCombination.objects
+        .filter(
+            recipe__project_id=project_id,
+            **{f"recipe__{field}": value for field, value in archived.items()}
+        )
+        .values_list("recipe_id", "combination_id")
+    )
+    combination_ids = {combination_id for _, combination_id in recipe_combinations}
+
+    defaults = list(
+        CombinationTag.objects
+        .filter(combination_id__in=combination_ids)
+        .order_by("combination_id", "tag_id")
+        .values_list("combination_id", "tag_id", "value")
+    )
+
+    overrides = list(
+        RecipeCombinationTagValue.objects
+        .filter(
+            recipe_combination__recipe__project_id=project_id,
+            **{f"recipe_combination__recipe__{field}": value for field, value in archived.items()}
+        )
+        .values_list(
+            "recipe_combination__recipe_id",
+            "recipe_combination__combination_id",
+            "tag_id",
+            "value",
+        )
+    )
+
+    column_keys = sorted(
+        {(combination_id, tag_id) for combination_id, tag_id, _ in defaults}
+        | {(combination_id, tag_id) for _, combination_id, tag_id, _ in overrides}
+    )
+    column_index = {key: idx for idx, key in enumerate(column_keys)}
+
+    matrix = np.full((len(recipes), len(column_keys)), np.nan, dtype=np.float64)
+
+    rows_by_combination = defaultdict(list)
+    for recipe_id, combination_id in recipe_combinations:
+        rows_by_combination[combination_id].append(row_index[recipe_id])
+
+    default_columns = defaultdict(list)
+    default_values = defaultdict(list)
+    for combination_id, tag_id, value in defaults:
+        default_columns[combination_id].append(column_index[(combination_id, tag_id)])
+        default_values[combination_id].append(value)
+
+    for combination_id, rows in rows_by_combination.items():
+        if default_columns[combination_id]:
+            matrix[np.ix_(rows, default_columns[combination_id])] = default_values[combination_id]
+
+    if overrides:
+        matrix[
+            [row_index[recipe_id] for recipe_id, _, _, _ in overrides],
+            [column_index[(combination_id, tag_id)] for _, combination_id, tag_id, _ in overrides],
+        ] = [value for _, _, _, value in overrides]
+
+    combination_names = dict(
+        Combination.objects
+        .filter(id__in={combination_id for combination_id, _ in column_keys})
+        .values_list("id", "name")
+    )
+    tag_names = dict(
+        Tag.objects
+        .filter(id__in={tag_id for _, tag_id in column_keys})
+        .values_list("id", "name")
+    )
+
+    header = {
+        "rows": [{"id": recipe_id, "name": name} for recipe_id, name in recipes],
+        "columns": [
+            {
+                "combination_id": combination_id,
+                "combination": combination_names[combination_id],
+                "tag_id": tag_id,
+                "tag": tag_names[tag_id],
+            }
+            for combination_id, tag_id in column_keys
+        ],
+    }
+
+    return header, matrix
+
+
+# Layout: little-endian uint32 header length, UTF-8 JSON header with the
+# row and column labels, then the matrix as an NPY buffer. Cells for a
+# combination the recipe does not use are NaN.
+def encode_matrix(header, matrix):
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+
+    buffer = io.BytesIO()
+    buffer.write(struct.pack("<I", len(header_bytes)))
+    buffer.write(header_bytes)
+    np.save(buffer, matrix, allow_pickle=False)
+
+    return buffer.getvalue()
+
+
+def decode_matrix(data):
+    (header_length,) = struct.unpack_from("<I", data)
+    header = json.loads(data[4:4 + header_length])
+    matrix = np.load(io.BytesIO(data[4 + header_length:]), allow_pickle=False)
+    return header, matrix
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_resolvedrecipesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CombinationSnapshot',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('payload', models.JSONField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('name', models.CharField(max_length=50)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('combination_hashes', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='recipes.recipe')),
+            ],
+            options={
+                'ordering': ['-version'],
+                'unique_together': {('recipe', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('recipes', '0003_combinationsnapshot_recipeversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='recipes_rec_project_3c1d59_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['project', 'name'], name='recipes_rec_project_cc0f7a_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipeimportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipecombinationtagvalue',
+            index=models.Index(fields=['tag', 'value'], name='recipes_rec_tag_id_d6b4e3_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_searchentry'),
+        ('recipes', '0006_recipecombinationtagvalue_recipes_rec_tag_id_d6b4e3_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['project', 'created_at', 'id'], name='recipe_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipeimportjob',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
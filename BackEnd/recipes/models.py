@@ -1,4 +1,8 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
+from django.conf import settings
 from projects.models import Project
 
 
@@ -34,6 +38,12 @@ class CombinationTag(models.Model):
         unique_together = ("combination", "tag")
 
 
+class CatalogVersion(models.Model):
+    # Single row, bumped whenever tags, combinations or their defaults
+    # change; the catalog ETags are derived from it.
+    version = models.PositiveIntegerField(default=1)
+
+
 class Recipe(models.Model):
     name = models.CharField(max_length=50)
     project = models.ForeignKey(
@@ -48,6 +58,16 @@ class Recipe(models.Model):
 
     class Meta:
         unique_together = ("name", "project")
+        indexes = [
+            models.Index(fields=["project", "created_at", "id"]),
+            models.Index(fields=["project", "name"]),
+            # Listings default to active recipes, a small slice of the table.
+            models.Index(
+                fields=["project", "created_at", "id"],
+                condition=models.Q(is_archived=False),
+                name="recipe_active_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} (v{self.version})"
@@ -84,3 +104,77 @@ class RecipeCombinationTagValue(models.Model):
 
     class Meta:
         unique_together = ("recipe_combination", "tag")
+        indexes = [
+            models.Index(fields=["tag", "value"]),
+        ]
+
+
+class ResolvedRecipeSnapshot(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name="resolved_snapshots",
+        on_delete=models.CASCADE
+    )
+    version = models.PositiveIntegerField()
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("recipe", "version")
+
+
+class CombinationSnapshot(models.Model):
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    payload = models.JSONField()
+
+
+class RecipeVersion(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name="versions",
+        on_delete=models.CASCADE
+    )
+    version = models.PositiveIntegerField()
+    name = models.CharField(max_length=50)
+    content_hash = models.CharField(max_length=64)
+    combination_hashes = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("recipe", "version")
+        ordering = ["-version"]
+
+
+class RecipeImportJob(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(
+        Project,
+        related_name="recipe_imports",
+        on_delete=models.CASCADE
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default="pending"
+    )
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set on every status or progress update; see importer.fail_if_stale.
+    updated_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,88 @@
+from django.db.models import Exists, OuterRef, Q
+
+from .models import RecipeCombination, RecipeCombinationTagValue
+
+MAX_PREDICATES = 20
+MAX_DEPTH = 4
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+class RecipeQueryError(Exception):
+    pass
+
+
+def parse_number(node, key):
+    try:
+        return int(node[key]) if key.endswith("_id") else float(node[key])
+    except (TypeError, ValueError):
+        raise RecipeQueryError(f"{key} must be a number")
+
+
+# A leaf matches a recipe when one of its combinations (optionally a given
+# one) has an effective value for the tag inside the range: the recipe's
+# override if there is one, otherwise the combination default. Each branch
+# is an EXISTS driven by the (tag, value) index.
+def tag_range_q(node):
+    if "tag_id" not in node:
+        raise RecipeQueryError("Predicate is missing tag_id")
+
+    tag_id = parse_number(node, "tag_id")
+    bounds = {
+        op: parse_number(node, op)
+        for op in RANGE_OPERATORS
+        if node.get(op) is not None
+    }
+    if not bounds:
+        raise RecipeQueryError(f"Predicate on tag {tag_id} needs one of {', '.join(RANGE_OPERATORS)}")
+
+    combination = {}
+    if node.get("combination_id") is not None:
+        combination["combination_id"] = parse_number(node, "combination_id")
+
+    overrides = RecipeCombinationTagValue.objects.filter(
+        recipe_combination__recipe=OuterRef("pk"),
+        tag_id=tag_id,
+        **{f"recipe_combination__{field}": value for field, value in combination.items()},
+        **{f"value__{op}": value for op, value in bounds.items()}
+    )
+
+    defaults = RecipeCombination.objects.filter(
+        recipe=OuterRef("pk"),
+        combination__tag_values__tag_id=tag_id,
+        **combination,
+        **{f"combination__tag_values__value__{op}": value for op, value in bounds.items()}
+    ).exclude(
+        Exists(RecipeCombinationTagValue.objects.filter(
+            recipe_combination=OuterRef("pk"),
+            tag_id=tag_id
+        ))
+    )
+
+    return Q(Exists(overrides)) | Q(Exists(defaults))
+
+
+def build_recipe_query(node, depth=0, counter=None):
+    counter = counter if counter is not None else [0]
+
+    if not isinstance(node, dict):
+        raise RecipeQueryError("Predicates must be objects")
+    if depth > MAX_DEPTH:
+        raise RecipeQueryError(f"Predicates can be nested at most {MAX_DEPTH} levels deep")
+
+    for operator in ("and", "or"):
+        if operator in node:
+            children = node[operator]
+            if not isinstance(children, list) or not children:
+                raise RecipeQueryError(f"{operator} must be a non-empty list")
+
+            q = Q()
+            for child in children:
+                child_q = build_recipe_query(child, depth + 1, counter)
+                q = q & child_q if operator == "and" else q | child_q
+            return q
+
+    counter[0] += 1
+    if counter[0] > MAX_PREDICATES:
+        raise RecipeQueryError(f"At most {MAX_PREDICATES} predicates are allowed")
+
+    return tag_range_q(node)
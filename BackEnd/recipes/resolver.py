@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+from django.db import transaction, IntegrityError
+
+from .models import (
+    Tag,
+    CombinationTag,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+    ResolvedRecipeSnapshot,
+)
+
+
+# A recipe override wins over the combination default. Every tag of a
+# combination has a default (CombinationTag.value is required), and tags
+# only present as overrides resolve to the override.
+def resolve_recipes(recipe_ids):
+    recipe_combinations = list(
+        RecipeCombination.objects
+        .filter(recipe_id__in=recipe_ids)
+        .order_by("recipe_id", "order", "id")
+        .values("id", "recipe_id", "combination_id", "combination__name", "order")
+    )
+
+    combination_defaults = defaultdict(dict)
+    for combination_id, tag_id, value in (
+        CombinationTag.objects
+        .filter(combination_id__in={rc["combination_id"] for rc in recipe_combinations})
+        .order_by("id")
+        .values_list("combination_id", "tag_id", "value")
+    ):
+        combination_defaults[combination_id][tag_id] = value
+
+    overrides = defaultdict(dict)
+    for recipe_combination_id, tag_id, value in (
+        RecipeCombinationTagValue.objects
+        .filter(recipe_combination__recipe_id__in=recipe_ids)
+        .order_by("id")
+        .values_list("recipe_combination_id", "tag_id", "value")
+    ):
+        overrides[recipe_combination_id][tag_id] = value
+
+    tag_ids = set()
+    for defaults in combination_defaults.values():
+        tag_ids.update(defaults)
+    for values in overrides.values():
+        tag_ids.update(values)
+
+    tags = dict(
+        Tag.objects
+        .filter(id__in=tag_ids)
+        .values_list("id", "name")
+    )
+
+    resolved = {recipe_id: [] for recipe_id in recipe_ids}
+
+    for rc in recipe_combinations:
+        defaults = combination_defaults.get(rc["combination_id"], {})
+        custom = overrides.get(rc["id"], {})
+
+        values = []
+        for tag_id in list(defaults) + [t for t in custom if t not in defaults]:
+            if tag_id in custom:
+                value, source = custom[tag_id], "override"
+            else:
+                value, source = defaults[tag_id], "combination"
+
+            values.append({
+                "tag_id": tag_id,
+                "name": tags[tag_id],
+                "value": value,
+                "source": source,
+            })
+
+        resolved[rc["recipe_id"]].append({
+            "id": rc["id"],
+            "combination_id": rc["combination_id"],
+            "name": rc["combination__name"],
+            "order": rc["order"],
+            "tag_values": values,
+        })
+
+    return resolved
+
+
+def get_resolved_recipe(recipe):
+    snapshot = (
+        ResolvedRecipeSnapshot.objects
+        .filter(recipe=recipe, version=recipe.version)
+        .values_list("payload", flat=True)
+        .first()
+    )
+    if snapshot is not None:
+        return snapshot
+
+    payload = {
+        "id": recipe.id,
+        "name": recipe.name,
+        "version": recipe.version,
+        "combinations": resolve_recipes([recipe.id])[recipe.id],
+    }
+
+    try:
+        with transaction.atomic():
+            ResolvedRecipeSnapshot.objects.create(
+                recipe=recipe,
+                version=recipe.version,
+                payload=payload
+            )
+    except IntegrityError:
+        pass
+
+    return payload
+
+
+def invalidate_resolved_recipes(recipe_ids):
+    ResolvedRecipeSnapshot.objects.filter(recipe_id__in=recipe_ids).delete()
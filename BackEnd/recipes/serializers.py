@@ -1,4 +1,7 @@
+import math
+
 from rest_framework import serializers
+from config.instrumentation import TimedSerializerMixin
 from .models import (
     Tag,
     Combination,
@@ -7,15 +10,90 @@ from .models import (
     RecipeCombination,
     RecipeCombinationTagValue
 )
+from .utils import validate_catalog_references, load_catalog_ids, catalog_errors
+
+
+def parse_tag_values(idx, value):
+    if not isinstance(value, list):
+        raise serializers.ValidationError(
+            f"Combination {idx}: tag_values must be a list"
+        )
+
+    tag_values = []
+    seen_tags = set()
+    for tag_value in value:
+        try:
+            tag_id = int(tag_value["tag_id"])
+            tag_val = float(tag_value["value"])
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                f"Combination {idx}: invalid tag value {tag_value}"
+            )
+
+        if not math.isfinite(tag_val):
+            raise serializers.ValidationError(
+                f"Combination {idx}: tag {tag_id} value must be a finite number"
+            )
+
+        if tag_id in seen_tags:
+            raise serializers.ValidationError(
+                f"Combination {idx}: duplicate tag {tag_id}"
+            )
+        seen_tags.add(tag_id)
+        tag_values.append({"tag_id": tag_id, "value": tag_val})
+
+    return tag_values
+
+
+def parse_combination_id(idx, combo, seen):
+    if "id" not in combo:
+        raise serializers.ValidationError(
+            f"Combination {idx}: missing id"
+        )
+
+    try:
+        combination_id = int(combo["id"])
+    except (TypeError, ValueError):
+        raise serializers.ValidationError(
+            f"Combination {idx}: invalid id"
+        )
+
+    if combination_id in seen:
+        raise serializers.ValidationError(
+            f"Combination {idx}: duplicate combination {combination_id}"
+        )
+    seen.add(combination_id)
+
+    return combination_id
+
+
+def parse_combinations(value):
+    combinations = []
+    seen = set()
+
+    for idx, combo in enumerate(value):
+        combination_id = parse_combination_id(idx, combo, seen)
+
+        if "tag_values" not in combo:
+            raise serializers.ValidationError(
+                f"Combination {idx}: missing tag_values"
+            )
+
+        combinations.append({
+            "id": combination_id,
+            "tag_values": parse_tag_values(idx, combo["tag_values"]),
+        })
+
+    return combinations
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ["id", "name", "default_value"]
 
 
-class CombinationTagSerializer(serializers.ModelSerializer):
+class CombinationTagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tag = TagSerializer()
 
     class Meta:
@@ -23,7 +101,7 @@ class CombinationTagSerializer(serializers.ModelSerializer):
         fields = ["tag", "value"]
 
 
-class CombinationSerializer(serializers.ModelSerializer):
+class CombinationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tag_values = CombinationTagSerializer(many=True)
 
     class Meta:
@@ -31,7 +109,7 @@ class CombinationSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "tag_values"]
 
 
-class RecipeCombinationTagValueSerializer(serializers.ModelSerializer):
+class RecipeCombinationTagValueSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tag = TagSerializer()
 
     class Meta:
@@ -39,7 +117,7 @@ class RecipeCombinationTagValueSerializer(serializers.ModelSerializer):
         fields = ["tag", "value"]
 
 
-class RecipeCombinationDetailSerializer(serializers.ModelSerializer):
+class RecipeCombinationDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     combination = CombinationSerializer()
     custom_tag_values = RecipeCombinationTagValueSerializer(many=True)
 
@@ -48,7 +126,7 @@ class RecipeCombinationDetailSerializer(serializers.ModelSerializer):
         fields = ["id", "order", "combination", "custom_tag_values"]
 
 
-class RecipeDetailSerializer(serializers.ModelSerializer):
+class RecipeDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     recipe_combinations = RecipeCombinationDetailSerializer(many=True)
 
     class Meta:
@@ -56,7 +134,7 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "version", "recipe_combinations", "created_at", "updated_at", "is_archived"]
 
 
-class RecipeCreateSerializer(serializers.Serializer):
+class RecipeCreateSerializer(TimedSerializerMixin, serializers.Serializer):
     name = serializers.CharField(max_length=50)
     combinations = serializers.ListField(
         child=serializers.DictField(
@@ -66,13 +144,109 @@ class RecipeCreateSerializer(serializers.Serializer):
     )
 
     def validate_combinations(self, value):
-        for idx, combo in enumerate(value):
-            if "id" not in combo:
+        combinations = parse_combinations(value)
+
+        # Bulk callers (the importer) check the catalog for every recipe at once.
+        if self.context.get("check_catalog", True):
+            errors = validate_catalog_references(combinations)
+            if errors:
+                raise serializers.ValidationError(errors)
+
+        return combinations
+
+
+
+class RecipeCloneSerializer(TimedSerializerMixin, serializers.Serializer):
+    name = serializers.CharField(max_length=50, required=False)
+    project_id = serializers.UUIDField(required=False)
+
+
+class RecipeDeltaSerializer(TimedSerializerMixin, serializers.Serializer):
+    name = serializers.CharField(max_length=50, required=False)
+    expected_version = serializers.IntegerField(min_value=1, required=False)
+    add = serializers.ListField(
+        child=serializers.DictField(child=serializers.JSONField()),
+        required=False,
+        default=list
+    )
+    update = serializers.ListField(
+        child=serializers.DictField(child=serializers.JSONField()),
+        required=False,
+        default=list
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list
+    )
+    order = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+
+    def validate_add(self, value):
+        return parse_combinations(value)
+
+    def validate_update(self, value):
+        updates = []
+        seen = set()
+
+        for idx, entry in enumerate(value):
+            combination_id = parse_combination_id(idx, entry, seen)
+            tag_values = parse_tag_values(idx, entry.get("tag_values", []))
+
+            try:
+                remove_tags = sorted({int(tag_id) for tag_id in entry.get("remove_tags", [])})
+            except (TypeError, ValueError):
                 raise serializers.ValidationError(
-                    f"Combination {idx}: missing id"
+                    f"Combination {idx}: invalid remove_tags"
                 )
-            if "tag_values" not in combo:
+
+            both = set(remove_tags) & {tag_value["tag_id"] for tag_value in tag_values}
+            if both:
                 raise serializers.ValidationError(
-                    f"Combination {idx}: missing tag_values"
+                    f"Combination {idx}: tags {sorted(both)} are both set and removed"
                 )
-        return value
\ No newline at end of file
+
+            updates.append({
+                "id": combination_id,
+                "tag_values": tag_values,
+                "remove_tags": remove_tags,
+            })
+
+        return updates
+
+    def validate_remove(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate combinations")
+        return value
+
+    def validate_order(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate combinations")
+        return value
+
+    def validate(self, data):
+        add_ids = {combo["id"] for combo in data["add"]}
+        update_ids = {entry["id"] for entry in data["update"]}
+        remove_ids = set(data["remove"])
+
+        overlap = (add_ids & update_ids) | (add_ids & remove_ids) | (update_ids & remove_ids)
+        if overlap:
+            raise serializers.ValidationError(
+                f"Combinations {sorted(overlap)} appear in more than one of add, update and remove"
+            )
+
+        if data["add"] or data["update"]:
+            known_combinations, known_tags = load_catalog_ids([data["add"], data["update"]])
+
+            # Updated combinations are checked against the recipe itself.
+            errors = {
+                "add": catalog_errors(data["add"], known_combinations, known_tags),
+                "update": catalog_errors(data["update"], update_ids, known_tags),
+            }
+            errors = {field: messages for field, messages in errors.items() if messages}
+            if errors:
+                raise serializers.ValidationError(errors)
+
+        return data
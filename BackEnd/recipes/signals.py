@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from projects.search import index_recipes
+from .catalog import bump_catalog_version
+from .models import (
+    Tag,
+    Recipe,
+    Combination,
+    CombinationTag,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+    ResolvedRecipeSnapshot,
+)
+
+# Only save signals on Recipe, RecipeCombination and
+# RecipeCombinationTagValue: a delete receiver would stop Django from
+# fast-deleting them when a recipe or project is removed. The recipe write
+# paths invalidate snapshots themselves, and search entries go with their
+# project.
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    index_recipes([instance])
+
+
+@receiver(post_save, sender=RecipeCombination)
+def recipe_combination_changed(sender, instance, **kwargs):
+    ResolvedRecipeSnapshot.objects.filter(recipe_id=instance.recipe_id).delete()
+
+
+@receiver(post_save, sender=RecipeCombinationTagValue)
+def recipe_tag_value_changed(sender, instance, **kwargs):
+    ResolvedRecipeSnapshot.objects.filter(
+        recipe__recipe_combinations=instance.recipe_combination_id
+    ).delete()
+
+
+@receiver(post_save, sender=CombinationTag)
+@receiver(post_delete, sender=CombinationTag)
+def combination_default_changed(sender, instance, **kwargs):
+    ResolvedRecipeSnapshot.objects.filter(
+        recipe__recipe_combinations__combination_id=instance.combination_id
+    ).delete()
+
+
+# Snapshots carry the combination name; pre_delete because the cascade
+# removes the RecipeCombination rows the lookup goes through.
+@receiver(post_save, sender=Combination)
+@receiver(pre_delete, sender=Combination)
+def combination_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+
+    ResolvedRecipeSnapshot.objects.filter(
+        recipe__recipe_combinations__combination_id=instance.id
+    ).delete()
+
+
+@receiver(post_save, sender=Tag)
+def tag_changed(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    ResolvedRecipeSnapshot.objects.filter(
+        recipe__recipe_combinations__combination__tag_values__tag_id=instance.id
+    ).delete()
+    ResolvedRecipeSnapshot.objects.filter(
+        recipe__recipe_combinations__custom_tag_values__tag_id=instance.id
+    ).delete()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Combination)
+@receiver(post_delete, sender=Combination)
+@receiver(post_save, sender=CombinationTag)
+@receiver(post_delete, sender=CombinationTag)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
@@ -1 +1,854 @@
-from django.test import TestCase
\ No newline at end of file
+import csv
+import json
+import math
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError, connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project, ProjectMember
+from users.models import User
+from .importer import run_import_job, parse_import_csv, validate_import
+from .matrix import decode_matrix
+from .utils import is_duplicate_recipe_name
+from .versioning import bump_recipe_version
+from .models import (
+    Tag,
+    Combination,
+    CombinationTag,
+    Recipe,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+    ResolvedRecipeSnapshot,
+    CombinationSnapshot,
+    RecipeImportJob,
+    RecipeVersion,
+)
+
+
+class RecipeTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email="owner@example.com",
+            password="secret-pass-123",
+            full_name="Owner"
+        )
+        cls.project = Project.objects.create(
+            name="Line 1",
+            root_admin=cls.owner,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+
+        cls.tags = Tag.objects.bulk_create([
+            Tag(name=f"Tag{i}", default_value=i) for i in range(1, 41)
+        ])
+        cls.combinations = Combination.objects.bulk_create([
+            Combination(name=f"C{i}") for i in range(1, 5)
+        ])
+        CombinationTag.objects.bulk_create([
+            CombinationTag(combination=combo, tag=tag, value=idx)
+            for idx, combo in enumerate(cls.combinations)
+            for tag in cls.tags[idx * 10:(idx + 1) * 10]
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def recipe_payload(self, name, combo_count):
+        return {
+            "name": name,
+            "combinations": [
+                {
+                    "id": combo.id,
+                    "tag_values": [
+                        {"tag_id": tag.id, "value": 1.5}
+                        for tag in self.tags[idx * 10:(idx + 1) * 10]
+                    ],
+                }
+                for idx, combo in enumerate(self.combinations[:combo_count])
+            ],
+        }
+
+    def create_recipe(self, name, combo_count):
+        return self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            self.recipe_payload(name, combo_count),
+            format="json"
+        )
+
+
+class CreateRecipeViewTests(RecipeTestCase):
+    def test_creates_combinations_and_tag_values(self):
+        response = self.create_recipe("R1", 3)
+
+        self.assertEqual(response.status_code, 201)
+        recipe = Recipe.objects.get(id=response.data["id"])
+        self.assertEqual(
+            list(recipe.recipe_combinations.values_list("order", flat=True)),
+            [0, 1, 2]
+        )
+        self.assertEqual(
+            RecipeCombinationTagValue.objects.filter(
+                recipe_combination__recipe=recipe
+            ).count(),
+            30
+        )
+
+    def test_query_count_is_independent_of_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.create_recipe("Small", 1)
+        with CaptureQueriesContext(connection) as large:
+            self.create_recipe("Large", 4)
+
+        self.assertEqual(len(small), len(large))
+
+    def test_rejects_unknown_references(self):
+        payload = self.recipe_payload("Bad", 1)
+        payload["combinations"][0]["tag_values"].append(
+            {"tag_id": 999999, "value": 1}
+        )
+        payload["combinations"].append({"id": 999999, "tag_values": []})
+
+        response = self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            payload,
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data["combinations"]), 2)
+        self.assertFalse(Recipe.objects.filter(name="Bad").exists())
+
+    def test_rejects_values_that_are_not_finite(self):
+        for value in ("nan", "inf", "-Infinity"):
+            payload = self.recipe_payload("Bad", 1)
+            payload["combinations"][0]["tag_values"][0]["value"] = value
+
+            response = self.client.post(
+                f"/api/recipes/projects/{self.project.id}/recipes/create/",
+                payload,
+                format="json"
+            )
+
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("finite", str(response.data))
+        self.assertFalse(Recipe.objects.filter(name="Bad").exists())
+
+    def test_only_name_conflicts_are_reported_as_duplicates(self):
+        error = IntegrityError("NOT NULL constraint failed: recipes_recipeversion.name")
+
+        with mock.patch("recipes.views.record_recipe_version", side_effect=error):
+            with self.assertRaises(IntegrityError):
+                self.create_recipe("R1", 1)
+
+        Recipe.objects.create(name="R1", project=self.project)
+        with self.assertRaises(IntegrityError) as raised, transaction.atomic():
+            Recipe.objects.create(name="R1", project=self.project)
+        self.assertTrue(is_duplicate_recipe_name(raised.exception))
+
+
+class RecipeDetailViewTests(RecipeTestCase):
+    def test_returns_nested_payload(self):
+        recipe_id = self.create_recipe("R1", 2).data["id"]
+
+        response = self.client.get(f"/api/recipes/recipes/{recipe_id}/")
+
+        self.assertEqual(response.status_code, 200)
+        combos = response.data["recipe_combinations"]
+        self.assertEqual(len(combos), 2)
+        self.assertEqual(len(combos[0]["combination"]["tag_values"]), 10)
+        self.assertEqual(combos[1]["custom_tag_values"][0]["value"], 1.5)
+        self.assertEqual(
+            combos[1]["custom_tag_values"][0]["tag"]["name"],
+            self.tags[10].name
+        )
+
+    def test_query_count_is_constant(self):
+        small_id = self.create_recipe("Small", 1).data["id"]
+        large_id = self.create_recipe("Large", 4).data["id"]
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f"/api/recipes/recipes/{small_id}/")
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(f"/api/recipes/recipes/{large_id}/")
+
+        self.assertEqual(len(small), len(large))
+        self.assertLessEqual(len(large), 8)
+
+    def test_missing_recipe_returns_404(self):
+        response = self.client.get("/api/recipes/recipes/999999/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class UpdateRecipeViewTests(RecipeTestCase):
+    def patch(self, recipe_id, delta):
+        return self.client.patch(
+            f"/api/recipes/recipes/{recipe_id}/update/",
+            delta,
+            format="json"
+        )
+
+    def test_changes_only_touched_rows(self):
+        recipe_id = self.create_recipe("R1", 3).data["id"]
+        untouched = dict(
+            RecipeCombinationTagValue.objects
+            .filter(recipe_combination__recipe_id=recipe_id)
+            .exclude(tag=self.tags[0])
+            .values_list("id", "value")
+        )
+
+        response = self.patch(recipe_id, {
+            "expected_version": 1,
+            "update": [{
+                "id": self.combinations[0].id,
+                "tag_values": [{"tag_id": self.tags[0].id, "value": 7}],
+            }],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["version"], 2)
+        self.assertEqual(
+            RecipeCombinationTagValue.objects.get(
+                recipe_combination__recipe_id=recipe_id,
+                tag=self.tags[0]
+            ).value,
+            7
+        )
+        self.assertEqual(
+            dict(
+                RecipeCombinationTagValue.objects
+                .filter(id__in=untouched)
+                .values_list("id", "value")
+            ),
+            untouched
+        )
+        resolved = self.client.get(f"/api/recipes/recipes/{recipe_id}/resolved/").data
+        self.assertEqual(resolved["combinations"][0]["tag_values"][0]["value"], 7)
+
+    def test_adds_removes_and_reorders(self):
+        recipe_id = self.create_recipe("R1", 3).data["id"]
+        first, second, third, fourth = [combo.id for combo in self.combinations]
+
+        response = self.patch(recipe_id, {
+            "add": [{"id": fourth, "tag_values": []}],
+            "remove": [second],
+            "update": [{"id": first, "remove_tags": [self.tags[0].id]}],
+            "order": [fourth, third, first],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(
+                RecipeCombination.objects
+                .filter(recipe_id=recipe_id)
+                .values_list("combination_id", flat=True)
+            ),
+            [fourth, third, first]
+        )
+        self.assertFalse(RecipeCombinationTagValue.objects.filter(
+            recipe_combination__recipe_id=recipe_id,
+            tag=self.tags[0]
+        ).exists())
+        version = self.client.get(f"/api/recipes/recipes/{recipe_id}/versions/2/").data
+        self.assertEqual(
+            [combo["combination_id"] for combo in version["combinations"]],
+            [fourth, third, first]
+        )
+
+    def test_noop_keeps_version(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+
+        response = self.patch(recipe_id, {
+            "update": [{
+                "id": self.combinations[0].id,
+                "tag_values": [{"tag_id": self.tags[0].id, "value": 1.5}],
+            }],
+        })
+
+        self.assertFalse(response.data["changed"])
+        self.assertEqual(response.data["version"], 1)
+
+    def test_query_count_is_independent_of_delta_size(self):
+        small_id = self.create_recipe("Small", 4).data["id"]
+        large_id = self.create_recipe("Large", 4).data["id"]
+
+        def delta(count):
+            return {
+                "update": [
+                    {
+                        "id": combo.id,
+                        "tag_values": [
+                            {"tag_id": tag.id, "value": 3}
+                            for tag in self.tags[idx * 10:idx * 10 + count]
+                        ],
+                    }
+                    for idx, combo in enumerate(self.combinations)
+                ],
+            }
+
+        with CaptureQueriesContext(connection) as small:
+            self.patch(small_id, delta(1))
+        with CaptureQueriesContext(connection) as large:
+            self.patch(large_id, delta(10))
+
+        self.assertEqual(len(small), len(large))
+
+    def test_rejects_stale_version_and_unknown_combinations(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+
+        stale = self.patch(recipe_id, {"expected_version": 5, "name": "R2"})
+        missing = self.patch(recipe_id, {"remove": [self.combinations[3].id]})
+        bad_order = self.patch(recipe_id, {"order": []})
+
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(bad_order.status_code, 400)
+        self.assertEqual(Recipe.objects.get(id=recipe_id).name, "R1")
+
+
+class CloneRecipeViewTests(RecipeTestCase):
+    def test_clones_within_project(self):
+        recipe_id = self.create_recipe("R1", 3).data["id"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f"/api/recipes/recipes/{recipe_id}/clone/",
+                {"name": "R1 copy"},
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLessEqual(len(queries), 17)
+        source = self.client.get(f"/api/recipes/recipes/{recipe_id}/resolved/").data
+        clone = self.client.get(f"/api/recipes/recipes/{response.data['id']}/resolved/").data
+        self.assertEqual(clone["combinations"], [
+            {**combo, "id": clone_combo["id"]}
+            for combo, clone_combo in zip(source["combinations"], clone["combinations"])
+        ])
+
+    def test_copies_into_administered_project_only(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+        other = Project.objects.create(
+            name="Line 2",
+            root_admin=User.objects.create_user(email="other@example.com", full_name="Other"),
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        url = f"/api/recipes/recipes/{recipe_id}/clone/"
+
+        denied = self.client.post(url, {"project_id": str(other.id)}, format="json")
+        ProjectMember.objects.create(
+            project=other,
+            user=self.owner,
+            role="admin",
+            status="accepted"
+        )
+        copied = self.client.post(url, {"project_id": str(other.id)}, format="json")
+        duplicate = self.client.post(url, {}, format="json")
+
+        with self.settings(PROJECT_ACCESS_TOKEN_REQUIRED=True):
+            locked = self.client.post(url, {"project_id": str(other.id), "name": "R2"}, format="json")
+
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(locked.data["detail"], "Project password required")
+        self.assertEqual(locked.data["project_id"], str(other.id))
+        self.assertEqual(copied.status_code, 201)
+        self.assertEqual(Recipe.objects.get(id=copied.data["id"]).project_id, other.id)
+        self.assertEqual(copied.data["name"], "R1")
+        self.assertEqual(duplicate.status_code, 400)
+
+
+class RecipeResolvedViewTests(RecipeTestCase):
+    def test_overrides_win_over_combination_defaults(self):
+        payload = self.recipe_payload("R1", 2)
+        payload["combinations"][0]["tag_values"] = [
+            {"tag_id": self.tags[0].id, "value": 7}
+        ]
+        recipe_id = self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            payload,
+            format="json"
+        ).data["id"]
+
+        response = self.client.get(f"/api/recipes/recipes/{recipe_id}/resolved/")
+
+        first = response.data["combinations"][0]["tag_values"]
+        self.assertEqual(len(first), 10)
+        self.assertEqual((first[0]["value"], first[0]["source"]), (7, "override"))
+        self.assertEqual((first[1]["value"], first[1]["source"]), (0, "combination"))
+        self.assertTrue(
+            ResolvedRecipeSnapshot.objects.filter(recipe_id=recipe_id).exists()
+        )
+
+    def test_snapshot_is_invalidated_by_default_change(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+        self.client.get(f"/api/recipes/recipes/{recipe_id}/resolved/")
+
+        CombinationTag.objects.filter(
+            combination=self.combinations[0]
+        ).first().save()
+
+        self.assertFalse(
+            ResolvedRecipeSnapshot.objects.filter(recipe_id=recipe_id).exists()
+        )
+
+    def test_snapshot_follows_combination_rename(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+        url = f"/api/recipes/recipes/{recipe_id}/resolved/"
+        self.client.get(url)
+
+        combination = Combination.objects.get(id=self.combinations[0].id)
+        combination.name = "Renamed"
+        combination.save()
+
+        self.assertEqual(self.client.get(url).data["combinations"][0]["name"], "Renamed")
+
+
+class ProjectRecipeQueryViewTests(RecipeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_recipe("Overridden", 2)
+
+        payload = self.recipe_payload("Tuned", 1)
+        payload["combinations"][0]["tag_values"] = [{"tag_id": self.tags[0].id, "value": 50}]
+        self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            payload,
+            format="json"
+        )
+
+        payload = self.recipe_payload("Defaults", 2)
+        for combo in payload["combinations"]:
+            combo["tag_values"] = []
+        self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            payload,
+            format="json"
+        )
+
+    def query(self, where, **extra):
+        return self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/query/",
+            {"where": where, **extra},
+            format="json"
+        )
+
+    def names(self, response):
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(r["name"] for r in response.data["results"])
+
+    def test_matches_overrides_in_range(self):
+        response = self.query({"tag_id": self.tags[0].id, "gte": 40, "lte": 60})
+
+        self.assertEqual(self.names(response), ["Tuned"])
+
+    def test_falls_back_to_combination_defaults(self):
+        where = {
+            "tag_id": self.tags[10].id,
+            "combination_id": self.combinations[1].id,
+            "gte": 0.5,
+            "lte": 1.2,
+        }
+
+        self.assertEqual(self.names(self.query(where)), ["Defaults"])
+
+    def test_combines_predicates(self):
+        tuned = {"tag_id": self.tags[0].id, "gt": 10}
+        low = {"tag_id": self.tags[0].id, "lt": 1}
+        overridden = {"tag_id": self.tags[15].id, "gte": 1.5, "lte": 1.5}
+
+        self.assertEqual(
+            self.names(self.query({"or": [tuned, low, overridden]})),
+            ["Defaults", "Overridden", "Tuned"]
+        )
+        self.assertEqual(self.names(self.query({"and": [low, overridden]})), [])
+
+        page = self.query({"or": [tuned, low, overridden]}, limit=2)
+        self.assertTrue(page.data["has_more"])
+        rest = self.query(
+            {"or": [tuned, low, overridden]},
+            limit=2,
+            cursor=page.data["next_cursor"]
+        )
+        self.assertEqual(len(page.data["results"]) + len(rest.data["results"]), 3)
+
+    def test_rejects_non_numeric_limit(self):
+        where = {"tag_id": self.tags[0].id, "gt": 10}
+
+        self.assertEqual(self.query(where, limit="ten").status_code, 400)
+        self.assertEqual(self.names(self.query(where, limit=0)), ["Tuned"])
+
+    def test_rejects_malformed_predicates(self):
+        self.assertEqual(self.query({"tag_id": self.tags[0].id}).status_code, 400)
+        self.assertEqual(self.query({"and": []}).status_code, 400)
+        self.assertEqual(self.query(None).status_code, 400)
+
+
+class ProjectRecipeMatrixViewTests(RecipeTestCase):
+    def test_returns_dense_matrix_with_labels(self):
+        self.create_recipe("R1", 1)
+        payload = self.recipe_payload("R2", 2)
+        payload["combinations"][1]["tag_values"] = [
+            {"tag_id": self.tags[10].id, "value": 4}
+        ]
+        self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/create/",
+            payload,
+            format="json"
+        )
+
+        response = self.client.get(
+            f"/api/recipes/projects/{self.project.id}/recipes/matrix/"
+        )
+
+        header, matrix = decode_matrix(response.content)
+        self.assertEqual(matrix.shape, (2, 20))
+        self.assertEqual([row["name"] for row in header["rows"]], ["R1", "R2"])
+        self.assertEqual(header["columns"][10]["tag"], self.tags[10].name)
+        self.assertEqual(matrix[0, 0], 1.5)
+        self.assertTrue(math.isnan(matrix[0, 10]))
+        self.assertEqual(matrix[1, 10], 4)
+        self.assertEqual(matrix[1, 11], 1)
+
+
+class RecipeVersionTests(RecipeTestCase):
+    def test_create_records_first_version(self):
+        recipe_id = self.create_recipe("R1", 2).data["id"]
+
+        response = self.client.get(f"/api/recipes/recipes/{recipe_id}/versions/1/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["combinations"]), 2)
+        self.assertEqual(
+            response.data["combinations"][1]["combination_id"],
+            self.combinations[1].id
+        )
+
+    def test_rollback_creates_new_version_sharing_combinations(self):
+        recipe_id = self.create_recipe("R1", 2).data["id"]
+        RecipeCombinationTagValue.objects.filter(
+            recipe_combination__recipe_id=recipe_id
+        ).update(value=9)
+        recipe = Recipe.objects.get(id=recipe_id)
+        bump_recipe_version(recipe)
+        snapshots_before = CombinationSnapshot.objects.count()
+
+        response = self.client.post(
+            f"/api/recipes/recipes/{recipe_id}/versions/1/rollback/"
+        )
+
+        self.assertEqual(response.data["version"], 3)
+        self.assertEqual(CombinationSnapshot.objects.count(), snapshots_before)
+        self.assertEqual(
+            set(RecipeCombinationTagValue.objects.filter(
+                recipe_combination__recipe_id=recipe_id
+            ).values_list("value", flat=True)),
+            {1.5}
+        )
+        versions = self.client.get(f"/api/recipes/recipes/{recipe_id}/versions/").data
+        self.assertEqual([v["version"] for v in versions], [3, 2, 1])
+        self.assertEqual(versions[0]["content_hash"], versions[2]["content_hash"])
+
+    def test_rollback_restores_the_version_name(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+        self.client.patch(
+            f"/api/recipes/recipes/{recipe_id}/update/",
+            {"name": "R2"},
+            format="json"
+        )
+
+        response = self.client.post(f"/api/recipes/recipes/{recipe_id}/versions/1/rollback/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Recipe.objects.get(id=recipe_id).name, "R1")
+        versions = {
+            v["version"]: v["content_hash"]
+            for v in self.client.get(f"/api/recipes/recipes/{recipe_id}/versions/").data
+        }
+        self.assertEqual(versions[3], versions[1])
+        self.assertNotEqual(versions[3], versions[2])
+
+    def test_unrecorded_version_is_read_without_writing(self):
+        recipe_id = self.create_recipe("R1", 2).data["id"]
+        RecipeVersion.objects.filter(recipe_id=recipe_id).delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            versions = self.client.get(f"/api/recipes/recipes/{recipe_id}/versions/").data
+
+        self.assertEqual([v["version"] for v in versions], [1])
+        self.assertFalse(any(q["sql"].startswith("INSERT") for q in queries))
+        self.assertFalse(RecipeVersion.objects.filter(recipe_id=recipe_id).exists())
+
+        bump_recipe_version(Recipe.objects.get(id=recipe_id))
+        self.assertEqual(
+            list(RecipeVersion.objects.filter(recipe_id=recipe_id).values_list("version", flat=True)),
+            [2]
+        )
+
+    def test_rollback_to_version_with_deleted_combination_conflicts(self):
+        recipe_id = self.create_recipe("R1", 2).data["id"]
+        bump_recipe_version(Recipe.objects.get(id=recipe_id))
+        RecipeCombination.objects.filter(recipe_id=recipe_id).delete()
+        Combination.objects.filter(id=self.combinations[1].id).delete()
+
+        response = self.client.post(
+            f"/api/recipes/recipes/{recipe_id}/versions/1/rollback/"
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["missing_combinations"], [self.combinations[1].id])
+
+
+class CatalogViewTests(RecipeTestCase):
+    def test_conditional_get_only_reads_the_version(self):
+        first = self.client.get("/api/recipes/combinations/")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json()), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(
+                "/api/recipes/combinations/",
+                HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+    def test_catalog_change_bumps_etag(self):
+        etag = self.client.get("/api/recipes/tags/")["ETag"]
+
+        Tag.objects.create(name="Fresh")
+
+        response = self.client.get("/api/recipes/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Fresh", [tag["name"] for tag in response.json()])
+
+
+class ProjectRecipesViewTests(RecipeTestCase):
+    def test_rejects_non_numeric_limit(self):
+        url = f"/api/recipes/projects/{self.project.id}/recipes/"
+        self.create_recipe("Alpha", 1)
+
+        self.assertEqual(self.client.get(url, {"limit": "ten"}).status_code, 400)
+        self.assertEqual(len(self.client.get(url, {"limit": -3}).data["results"]), 1)
+
+    def test_paginates_with_cursor_and_filters(self):
+        for name in ("Alpha", "Beta", "Alpine", "Gamma"):
+            self.create_recipe(name, 1)
+        Recipe.objects.filter(name="Beta").update(is_archived=True)
+        url = f"/api/recipes/projects/{self.project.id}/recipes/"
+
+        first = self.client.get(url, {"limit": 2}).data
+        second = self.client.get(url, {"limit": 2, "cursor": first["next_cursor"]}).data
+
+        self.assertEqual([r["name"] for r in first["results"]], ["Gamma", "Alpine"])
+        self.assertTrue(first["has_more"])
+        self.assertEqual([r["name"] for r in second["results"]], ["Alpha"])
+        self.assertFalse(second["has_more"])
+
+        filtered = self.client.get(url, {"name": "Alp"}).data
+        self.assertEqual(
+            [r["name"] for r in filtered["results"]],
+            ["Alpine", "Alpha"]
+        )
+
+        archived = self.client.get(url, {"is_archived": "true"}).data
+        self.assertEqual([r["name"] for r in archived["results"]], ["Beta"])
+
+
+class ArchiveRecipeViewTests(RecipeTestCase):
+    def test_archive_and_unarchive_single_recipe(self):
+        recipe_id = self.create_recipe("R1", 1).data["id"]
+        listing = f"/api/recipes/projects/{self.project.id}/recipes/"
+
+        archived = self.client.post(f"/api/recipes/recipes/{recipe_id}/archive/")
+
+        self.assertEqual(archived.data, {"id": recipe_id, "is_archived": True})
+        self.assertEqual(self.client.get(listing).data["results"], [])
+        self.assertEqual(
+            self.client.get(f"/api/recipes/recipes/{recipe_id}/").status_code,
+            200
+        )
+
+        self.client.post(f"/api/recipes/recipes/{recipe_id}/unarchive/")
+
+        self.assertEqual(len(self.client.get(listing).data["results"]), 1)
+
+    def test_bulk_archive_is_scoped_to_project(self):
+        ids = [self.create_recipe(f"R{i}", 1).data["id"] for i in range(3)]
+        other = Project.objects.create(
+            name="Line 2",
+            root_admin=self.owner,
+            access_key_hash="!",
+            pin_hash="!"
+        )
+        foreign = Recipe.objects.create(name="Foreign", project=other)
+        url = f"/api/recipes/projects/{self.project.id}/recipes/archive/"
+
+        response = self.client.post(url, {"ids": ids[:2] + [foreign.id]}, format="json")
+
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(
+            set(Recipe.objects.filter(is_archived=True).values_list("id", flat=True)),
+            set(ids[:2])
+        )
+        export = b"".join(self.client.get(
+            f"/api/recipes/projects/{self.project.id}/recipes/export/"
+        ).streaming_content)
+        self.assertEqual(len(export.splitlines()), 1)
+
+        restored = self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/unarchive/",
+            {"ids": ids},
+            format="json"
+        )
+        self.assertEqual(restored.data["updated"], 2)
+        self.assertEqual(self.client.post(url, {"ids": []}, format="json").status_code, 400)
+
+
+class ProjectRecipeExportViewTests(RecipeTestCase):
+    def export(self, output):
+        response = self.client.get(
+            f"/api/recipes/projects/{self.project.id}/recipes/export/",
+            {"output": output}
+        )
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_emits_one_resolved_recipe_per_line(self):
+        self.create_recipe("R1", 1)
+        self.create_recipe("R2", 2)
+
+        lines = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual([line["name"] for line in lines], ["R1", "R2"])
+        self.assertEqual(len(lines[1]["combinations"]), 2)
+        self.assertEqual(lines[1]["combinations"][1]["tag_values"][0]["value"], 1.5)
+
+    def test_csv_emits_one_row_per_tag(self):
+        self.create_recipe("R1", 2)
+
+        rows = list(csv.DictReader(self.export("csv").splitlines()))
+
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[10]["combination"], self.combinations[1].name)
+
+    def test_query_count_is_constant_within_a_chunk(self):
+        self.create_recipe("R1", 1)
+        url = f"/api/recipes/projects/{self.project.id}/recipes/export/"
+
+        with CaptureQueriesContext(connection) as small:
+            b"".join(self.client.get(url).streaming_content)
+        for idx in range(5):
+            self.create_recipe(f"More{idx}", 2)
+        with CaptureQueriesContext(connection) as large:
+            b"".join(self.client.get(url).streaming_content)
+
+        self.assertEqual(len(small), len(large))
+
+
+class ImportRecipesViewTests(RecipeTestCase):
+    def test_csv_import_creates_valid_recipes_and_reports_errors(self):
+        self.create_recipe("Existing", 1)
+        combo, other = self.combinations[0], self.combinations[1]
+        lines = ["recipe_name,combination_id,tag_id,value"]
+        lines += [f"New1,{combo.id},{tag.id},2" for tag in self.tags[:10]]
+        lines += [f"New2,{other.id},{self.tags[10].id},3"]
+        lines += [f"Existing,{combo.id},{self.tags[0].id},1"]
+        lines += [f"Broken,999999,{self.tags[0].id},1"]
+        upload = SimpleUploadedFile("recipes.csv", "\n".join(lines).encode())
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                f"/api/recipes/projects/{self.project.id}/recipes/import/",
+                {"file": upload},
+                format="multipart"
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["total_rows"], 4)
+        self.assertEqual(len(callbacks), 1)
+
+        upload.seek(0)
+        run_import_job(response.data["id"], parse_import_csv(upload.read().decode()))
+
+        job = RecipeImportJob.objects.get(id=response.data["id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((job.processed_rows, job.created_count), (4, 2))
+        self.assertEqual(
+            sorted(error["name"] for error in job.errors),
+            ["Broken", "Existing"]
+        )
+        new1 = Recipe.objects.get(name="New1")
+        self.assertEqual(
+            RecipeCombinationTagValue.objects.filter(
+                recipe_combination__recipe=new1
+            ).count(),
+            10
+        )
+        self.assertTrue(RecipeVersion.objects.filter(recipe=new1, version=1).exists())
+
+        status = self.client.get(f"/api/recipes/imports/{job.id}/")
+        self.assertEqual(status.data["created_count"], 2)
+
+    def test_rejects_non_object_body(self):
+        response = self.client.post(
+            f"/api/recipes/projects/{self.project.id}/recipes/import/",
+            [self.recipe_payload("R1", 1)],
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_insert_conflict_only_fails_the_conflicting_recipe(self):
+        rows = [self.recipe_payload("A", 1), self.recipe_payload("B", 1)]
+        job = RecipeImportJob.objects.create(project=self.project, total_rows=2)
+        checked, errors = validate_import(self.project.id, rows)
+        # "B" is created between validation and insert.
+        self.create_recipe("B", 1)
+
+        with mock.patch("recipes.importer.validate_import", return_value=(checked, errors)):
+            run_import_job(job.id, rows)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count), ("completed", 1))
+        self.assertEqual([error["name"] for error in job.errors], ["B"])
+        self.assertTrue(Recipe.objects.filter(project=self.project, name="A").exists())
+
+    def test_stale_jobs_are_reported_failed_and_not_resumed(self):
+        job = RecipeImportJob.objects.create(project=self.project, total_rows=1)
+        RecipeImportJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        with self.assertLogs("recipes.importer", "WARNING"):
+            response = self.client.get(f"/api/recipes/imports/{job.id}/")
+        self.assertEqual(response.data["status"], "failed")
+
+        run_import_job(job.id, [self.recipe_payload("Late", 1)])
+        self.assertFalse(Recipe.objects.filter(name="Late").exists())
+
+    @override_settings(PROJECT_ACCESS_TOKEN_REQUIRED=True)
+    def test_job_status_goes_through_project_permissions(self):
+        job = RecipeImportJob.objects.create(project=self.project, total_rows=1)
+        admin = User.objects.create_user(email="admin@example.com", full_name="Admin")
+        ProjectMember.objects.create(project=self.project, user=admin, role="admin", status="accepted")
+        outsider = User.objects.create_user(email="outsider@example.com", full_name="Outsider")
+        url = f"/api/recipes/imports/{job.id}/"
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get(url).data["detail"], "Project password required")
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
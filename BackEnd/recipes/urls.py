@@ -1,7 +1,20 @@
 from django.urls import path
 from .views import (
     ProjectRecipesView,
+    ProjectRecipeQueryView,
+    ProjectRecipeArchiveView,
+    ProjectRecipeMatrixView,
+    ProjectRecipeExportView,
+    ImportRecipesView,
+    RecipeImportJobView,
     RecipeDetailView,
+    UpdateRecipeView,
+    CloneRecipeView,
+    ArchiveRecipeView,
+    RecipeResolvedView,
+    RecipeVersionListView,
+    RecipeVersionDetailView,
+    RollbackRecipeView,
     CreateRecipeView,
     TagListView,
     CombinationListView
@@ -12,5 +25,20 @@ urlpatterns = [
     path("combinations/", CombinationListView.as_view()),
     path("projects/<uuid:project_id>/recipes/", ProjectRecipesView.as_view()),
     path("projects/<uuid:project_id>/recipes/create/", CreateRecipeView.as_view()),
+    path("projects/<uuid:project_id>/recipes/query/", ProjectRecipeQueryView.as_view()),
+    path("projects/<uuid:project_id>/recipes/archive/", ProjectRecipeArchiveView.as_view()),
+    path("projects/<uuid:project_id>/recipes/unarchive/", ProjectRecipeArchiveView.as_view(archived=False)),
+    path("projects/<uuid:project_id>/recipes/matrix/", ProjectRecipeMatrixView.as_view()),
+    path("projects/<uuid:project_id>/recipes/export/", ProjectRecipeExportView.as_view()),
+    path("projects/<uuid:project_id>/recipes/import/", ImportRecipesView.as_view()),
+    path("imports/<uuid:job_id>/", RecipeImportJobView.as_view()),
     path("recipes/<int:recipe_id>/", RecipeDetailView.as_view()),
+    path("recipes/<int:recipe_id>/update/", UpdateRecipeView.as_view()),
+    path("recipes/<int:recipe_id>/clone/", CloneRecipeView.as_view()),
+    path("recipes/<int:recipe_id>/archive/", ArchiveRecipeView.as_view()),
+    path("recipes/<int:recipe_id>/unarchive/", ArchiveRecipeView.as_view(archived=False)),
+    path("recipes/<int:recipe_id>/resolved/", RecipeResolvedView.as_view()),
+    path("recipes/<int:recipe_id>/versions/", RecipeVersionListView.as_view()),
+    path("recipes/<int:recipe_id>/versions/<int:version>/", RecipeVersionDetailView.as_view()),
+    path("recipes/<int:recipe_id>/versions/<int:version>/rollback/", RollbackRecipeView.as_view()),
 ]
\ No newline at end of file
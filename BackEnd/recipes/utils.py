@@ -1,19 +1,90 @@
-from projects.models import Project, ProjectMember
+from .models import (
+    Combination,
+    Tag,
+    Recipe,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+)
 
-def get_user_role(user, project_id):
-    try:
-        project = Project.objects.get(id=project_id)
-    except Project.DoesNotExist:
-        return None
 
-    if project.root_admin_id == user.id:
-        return "root"
+def load_catalog_ids(combination_lists):
+    combination_ids = set()
+    tag_ids = set()
+    for combinations in combination_lists:
+        for combo in combinations:
+            combination_ids.add(combo["id"])
+            tag_ids.update(tag_value["tag_id"] for tag_value in combo["tag_values"])
 
-    try:
-        member = ProjectMember.objects.get(
-            user=user,
-            project=project
+    known_combinations = set(
+        Combination.objects
+        .filter(id__in=combination_ids)
+        .values_list("id", flat=True)
+    )
+    known_tags = set(
+        Tag.objects
+        .filter(id__in=tag_ids)
+        .values_list("id", flat=True)
+    )
+
+    return known_combinations, known_tags
+
+
+def catalog_errors(combinations, known_combinations, known_tags):
+    errors = []
+    for idx, combo in enumerate(combinations):
+        if combo["id"] not in known_combinations:
+            errors.append(f"Combination {idx}: unknown combination {combo['id']}")
+
+        missing = sorted(
+            tag_value["tag_id"]
+            for tag_value in combo["tag_values"]
+            if tag_value["tag_id"] not in known_tags
+        )
+        if missing:
+            errors.append(f"Combination {idx}: unknown tags {missing}")
+
+    return errors
+
+
+def validate_catalog_references(combinations):
+    known_combinations, known_tags = load_catalog_ids([combinations])
+    return catalog_errors(combinations, known_combinations, known_tags)
+
+
+def bulk_create_recipe_combinations(recipes_with_combinations, start_order=0):
+    pairs = [
+        (recipe, combo, start_order + idx)
+        for recipe, combinations in recipes_with_combinations
+        for idx, combo in enumerate(combinations)
+    ]
+
+    recipe_combinations = RecipeCombination.objects.bulk_create([
+        RecipeCombination(
+            recipe=recipe,
+            combination_id=combo["id"],
+            order=order
         )
-        return member.role
-    except ProjectMember.DoesNotExist:
-        return None
+        for recipe, combo, order in pairs
+    ])
+
+    RecipeCombinationTagValue.objects.bulk_create([
+        RecipeCombinationTagValue(
+            recipe_combination=recipe_combination,
+            tag_id=tag_value["tag_id"],
+            value=tag_value["value"]
+        )
+        for recipe_combination, (_, combo, _) in zip(recipe_combinations, pairs)
+        for tag_value in combo["tag_values"]
+    ])
+
+    return recipe_combinations
+
+
+def create_recipe_combinations(recipe, combinations, start_order=0):
+    return bulk_create_recipe_combinations([(recipe, combinations)], start_order)
+
+
+# True when the IntegrityError is the (name, project) unique constraint;
+# SQLite reports the columns of the constraint that failed.
+def is_duplicate_recipe_name(exc):
+    return f"{Recipe._meta.db_table}.name" in str(exc)
@@ -0,0 +1,177 @@
+import hashlib
+import json
+from collections import defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    Recipe,
+    RecipeCombination,
+    RecipeCombinationTagValue,
+    CombinationSnapshot,
+    RecipeVersion,
+)
+from .resolver import invalidate_resolved_recipes
+
+
+def content_hash(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def combination_payloads(recipe_ids):
+    recipe_combinations = list(
+        RecipeCombination.objects
+        .filter(recipe_id__in=recipe_ids)
+        .order_by("recipe_id", "order", "id")
+        .values_list("id", "recipe_id", "combination_id")
+    )
+
+    tag_values = defaultdict(list)
+    for recipe_combination_id, tag_id, value in (
+        RecipeCombinationTagValue.objects
+        .filter(recipe_combination__recipe_id__in=recipe_ids)
+        .order_by("tag_id")
+        .values_list("recipe_combination_id", "tag_id", "value")
+    ):
+        tag_values[recipe_combination_id].append([tag_id, value])
+
+    payloads = {recipe_id: [] for recipe_id in recipe_ids}
+    for recipe_combination_id, recipe_id, combination_id in recipe_combinations:
+        payloads[recipe_id].append({
+            "combination_id": combination_id,
+            "tag_values": tag_values[recipe_combination_id],
+        })
+
+    return payloads
+
+
+# Each version row only holds the ordered hashes of its combinations;
+# combination contents are stored once per distinct hash and shared by
+# every version (and every recipe) that contains them.
+def build_recipe_versions(recipes):
+    payloads = combination_payloads([recipe.id for recipe in recipes])
+
+    snapshots = {}
+    versions = []
+    for recipe in recipes:
+        hashes = []
+        for payload in payloads[recipe.id]:
+            digest = content_hash(payload)
+            snapshots[digest] = payload
+            hashes.append(digest)
+
+        versions.append(RecipeVersion(
+            recipe=recipe,
+            version=recipe.version,
+            name=recipe.name,
+            content_hash=content_hash({"name": recipe.name, "combinations": hashes}),
+            combination_hashes=hashes,
+        ))
+
+    return versions, snapshots
+
+
+def record_recipe_versions(recipes):
+    versions, snapshots = build_recipe_versions(recipes)
+
+    CombinationSnapshot.objects.bulk_create(
+        [
+            CombinationSnapshot(content_hash=digest, payload=payload)
+            for digest, payload in snapshots.items()
+        ],
+        ignore_conflicts=True
+    )
+    RecipeVersion.objects.bulk_create(versions)
+
+    return versions
+
+
+def record_recipe_version(recipe):
+    return record_recipe_versions([recipe])[0]
+
+
+# Recipes written before versioning existed have no row for their current
+# version; write paths record it before changing the recipe.
+def ensure_recipe_version(recipe):
+    if not RecipeVersion.objects.filter(recipe=recipe, version=recipe.version).exists():
+        record_recipe_version(recipe)
+
+
+def current_recipe_version(recipe):
+    versions, snapshots = build_recipe_versions([recipe])
+    version = versions[0]
+
+    return {
+        "version": version.version,
+        "name": version.name,
+        "content_hash": version.content_hash,
+        "created_at": recipe.updated_at,
+        "combination_hashes": version.combination_hashes,
+    }, snapshots
+
+
+def get_recipe_version(recipe, version):
+    row = (
+        RecipeVersion.objects
+        .filter(recipe=recipe, version=version)
+        .values("version", "name", "content_hash", "combination_hashes", "created_at")
+        .first()
+    )
+
+    if row is not None:
+        snapshots = {
+            digest: snapshot.payload
+            for digest, snapshot in CombinationSnapshot.objects.in_bulk(row["combination_hashes"]).items()
+        }
+    elif version == recipe.version:
+        # Not recorded yet: built from the live rows without writing.
+        row, snapshots = current_recipe_version(recipe)
+    else:
+        return None
+
+    return {
+        "id": recipe.id,
+        "version": row["version"],
+        "name": row["name"],
+        "content_hash": row["content_hash"],
+        "created_at": row["created_at"],
+        "combinations": [
+            {
+                "order": order,
+                "combination_id": snapshots[digest]["combination_id"],
+                "tag_values": [
+                    {"tag_id": tag_id, "value": value}
+                    for tag_id, value in snapshots[digest]["tag_values"]
+                ],
+            }
+            for order, digest in enumerate(row["combination_hashes"])
+        ],
+    }
+
+
+def list_recipe_versions(recipe):
+    versions = list(
+        RecipeVersion.objects
+        .filter(recipe=recipe)
+        .values("version", "name", "content_hash", "created_at")
+    )
+
+    if not any(row["version"] == recipe.version for row in versions):
+        row, _ = current_recipe_version(recipe)
+        row.pop("combination_hashes")
+        versions.insert(0, row)
+
+    return versions
+
+
+def bump_recipe_version(recipe):
+    Recipe.objects.filter(id=recipe.id).update(
+        version=F("version") + 1,
+        updated_at=timezone.now()
+    )
+    recipe.refresh_from_db(fields=["version", "updated_at"])
+    invalidate_resolved_recipes([recipe.id])
+
+    return record_recipe_version(recipe)
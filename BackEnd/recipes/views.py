@@ -2,103 +2,475 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db import transaction
+from django.db import transaction, IntegrityError
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from .models import (
-    Recipe,
+    Tag,
     Combination,
+    Recipe,
     RecipeCombination,
-    Tag,
-    RecipeCombinationTagValue,
+    RecipeImportJob,
 )
 from .serializers import (
     RecipeDetailSerializer,
     RecipeCreateSerializer,
-    TagSerializer,
-    CombinationSerializer,
+    RecipeDeltaSerializer,
+    RecipeCloneSerializer,
+)
+from .utils import create_recipe_combinations, is_duplicate_recipe_name
+from .resolver import get_resolved_recipe
+from .delta import RecipeDeltaError, apply_recipe_delta
+from .cloning import clone_recipe
+from .versioning import (
+    record_recipe_version,
+    get_recipe_version,
+    list_recipe_versions,
+    ensure_recipe_version,
+    bump_recipe_version,
 )
-from .utils import get_user_role
-from projects.models import Project
+from .catalog import catalog_response, render_tags, render_combinations
+from .export import stream_ndjson, stream_csv
+from .importer import (
+    ImportFileError,
+    fail_if_stale,
+    parse_import_data,
+    start_import_job,
+    serialize_import_job,
+)
+from .query import RecipeQueryError, build_recipe_query
+from .matrix import build_project_matrix, encode_matrix, MATRIX_CONTENT_TYPE
+from projects.pagination import parse_cursor, parse_limit, cursor_paginate
+from projects.search import index_recipes
+from projects.permissions import IsProjectMember, IsProjectAdmin
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MAX_BULK_ARCHIVE = 1000
+
+
+def is_truthy(value):
+    return str(value).lower() in ("1", "true")
+
+
+def set_archived(queryset, archived):
+    return queryset.exclude(is_archived=archived).update(
+        is_archived=archived,
+        updated_at=timezone.now()
+    )
 
 
 class TagListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return Response(TagSerializer(Tag.objects.all(), many=True).data)
+        return catalog_response(request, "tags", render_tags)
 
 
 class CombinationListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        combinations = Combination.objects.prefetch_related("tag_values__tag")
-        return Response(CombinationSerializer(combinations, many=True).data)
+        return catalog_response(request, "combinations", render_combinations)
 
 
 class ProjectRecipesView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get(self, request, project_id):
+        cursor = parse_cursor(request.query_params.get("cursor"))
+        limit = parse_limit(request.query_params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+        if limit is None:
+            return Response({"detail": "limit must be an integer"}, status=400)
+
+        qs = Recipe.objects.filter(project_id=project_id)
+
+        qs = qs.filter(is_archived=is_truthy(request.query_params.get("is_archived", False)))
+
+        name = request.query_params.get("name", "").strip()
+        if name:
+            # A range instead of LIKE so SQLite can use the (project, name) index.
+            qs = qs.filter(name__gte=name, name__lt=name + "\U0010ffff")
+
+        recipes, has_more, next_cursor = cursor_paginate(
+            qs.values("id", "name", "created_at"),
+            cursor,
+            limit
+        )
+
+        return Response({
+            "results": [{"id": r["id"], "name": r["name"]} for r in recipes],
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        })
+
+
+class ProjectRecipeQueryView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def post(self, request, project_id):
+        try:
+            predicate = build_recipe_query(request.data.get("where"))
+        except RecipeQueryError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        qs = Recipe.objects.filter(project_id=project_id)
+        if not is_truthy(request.data.get("include_archived", False)):
+            qs = qs.filter(is_archived=False)
+
+        cursor = parse_cursor(request.data.get("cursor"))
+        limit = parse_limit(request.data.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+        if limit is None:
+            return Response({"detail": "limit must be an integer"}, status=400)
+
+        recipes, has_more, next_cursor = cursor_paginate(
+            qs
+            .filter(predicate)
+            .values("id", "name", "created_at"),
+            cursor,
+            limit
+        )
+
+        return Response({
+            "results": [{"id": r["id"], "name": r["name"]} for r in recipes],
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        })
+
+
+class ProjectRecipeArchiveView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+    archived = True
+
+    def post(self, request, project_id):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            return Response({"detail": "ids must be a non-empty list"}, status=400)
+        if len(ids) > MAX_BULK_ARCHIVE:
+            return Response(
+                {"detail": f"At most {MAX_BULK_ARCHIVE} recipes per request"},
+                status=400
+            )
+
+        try:
+            ids = [int(recipe_id) for recipe_id in ids]
+        except (TypeError, ValueError):
+            return Response({"detail": "ids must be recipe ids"}, status=400)
+
+        updated = set_archived(
+            Recipe.objects.filter(project_id=project_id, id__in=ids),
+            self.archived
+        )
+
+        return Response({"updated": updated, "is_archived": self.archived})
+
+
+class ProjectRecipeMatrixView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get(self, request, project_id):
+        header, matrix = build_project_matrix(
+            project_id,
+            include_archived=is_truthy(request.query_params.get("include_archived", False))
+        )
+
+        return HttpResponse(
+            encode_matrix(header, matrix),
+            content_type=MATRIX_CONTENT_TYPE
+        )
+
+
+class ProjectRecipeExportView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get(self, request, project_id):
+        # "format" is taken by DRF's renderer negotiation.
+        output = request.query_params.get("output", "ndjson")
         recipes = Recipe.objects.filter(project_id=project_id)
-        return Response([{"id": r.id, "name": r.name} for r in recipes])
+        if not is_truthy(request.query_params.get("include_archived", False)):
+            recipes = recipes.filter(is_archived=False)
+
+        if output == "ndjson":
+            response = StreamingHttpResponse(
+                stream_ndjson(recipes),
+                content_type="application/x-ndjson"
+            )
+        elif output == "csv":
+            response = StreamingHttpResponse(
+                stream_csv(recipes),
+                content_type="text/csv"
+            )
+        else:
+            return Response({"detail": "output must be ndjson or csv"}, status=400)
+
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes-{project_id}.{output}"'
+        )
+        return response
+
+
+class ImportRecipesView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+
+    def post(self, request, project_id):
+        try:
+            rows = parse_import_data(request)
+        except ImportFileError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        job = start_import_job(project_id, request.user, rows)
+
+        return Response(serialize_import_job(job), status=202)
+
+
+class RecipeImportJobView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(RecipeImportJob, id=job_id)
+        self.check_object_permissions(request, job)
+
+        return Response(serialize_import_job(fail_if_stale(job)))
 
 
 class RecipeDetailView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsProjectMember]
 
     def get(self, request, recipe_id):
-        recipe = Recipe.objects.get(id=recipe_id)
+        recipe = get_object_or_404(
+            Recipe.objects.prefetch_related(
+                Prefetch(
+                    "recipe_combinations",
+                    queryset=RecipeCombination.objects.select_related("combination")
+                ),
+                "recipe_combinations__combination__tag_values__tag",
+                "recipe_combinations__custom_tag_values__tag",
+            ),
+            id=recipe_id
+        )
         return Response(RecipeDetailSerializer(recipe).data)
 
 
-class CreateRecipeView(APIView):
-    permission_classes = [IsAuthenticated]
+class UpdateRecipeView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
 
-    @transaction.atomic
-    def post(self, request, project_id):
-        role = get_user_role(request.user, project_id)
+    def patch(self, request, recipe_id):
+        serializer = RecipeDeltaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        delta = serializer.validated_data
 
-        if role not in ("root", "admin"):
-            return Response({"detail": "Forbidden"}, status=403)
+        try:
+            with transaction.atomic():
+                recipe = get_object_or_404(
+                    Recipe.objects.select_for_update(),
+                    id=recipe_id
+                )
 
-        project = Project.objects.get(id=project_id)
+                expected_version = delta.get("expected_version")
+                if expected_version is not None and expected_version != recipe.version:
+                    return Response(
+                        {"detail": f"Recipe has been modified (current version {recipe.version})"},
+                        status=409
+                    )
 
-        serializer = RecipeCreateSerializer(data=request.data)
+                changed = apply_recipe_delta(recipe, delta)
+        except RecipeDeltaError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        except IntegrityError as exc:
+            if not is_duplicate_recipe_name(exc):
+                raise
+            return Response(
+                {"detail": "Recipe with this name already exists"},
+                status=400
+            )
+
+        return Response({
+            "id": recipe.id,
+            "name": recipe.name,
+            "version": recipe.version,
+            "changed": changed,
+        })
+
+
+class CloneRecipeView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def post(self, request, recipe_id):
+        serializer = RecipeCloneSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        name = serializer.validated_data["name"]
-        combinations_data = serializer.validated_data["combinations"]
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+        project_id = serializer.validated_data.get("project_id", recipe.project_id)
+        name = serializer.validated_data.get("name", recipe.name)
+
+        # The target project is checked like any admin-only endpoint,
+        # project password included.
+        target = IsProjectAdmin()
+        if not target.has_project_access(request, project_id=project_id):
+            self.permission_denied(request, message=target.message)
+
+        if Recipe.objects.filter(name=name, project_id=project_id).exists():
+            return Response(
+                {"detail": "Recipe with this name already exists"},
+                status=400
+            )
 
-        if Recipe.objects.filter(name=name, project=project).exists():
+        try:
+            with transaction.atomic():
+                clone = clone_recipe(recipe, project_id, name)
+        except IntegrityError as exc:
+            if not is_duplicate_recipe_name(exc):
+                raise
             return Response(
                 {"detail": "Recipe with this name already exists"},
                 status=400
             )
 
-        recipe = Recipe.objects.create(
-            name=name,
-            project=project,
-            version=1
+        return Response(
+            {"id": clone.id, "name": clone.name, "project_id": clone.project_id},
+            status=201
         )
 
-        for idx, combo_data in enumerate(combinations_data):
-            combination = Combination.objects.get(id=combo_data["id"])
 
-            recipe_combo = RecipeCombination.objects.create(
-                recipe=recipe,
-                combination=combination,
-                order=idx
+class ArchiveRecipeView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+    archived = True
+
+    def post(self, request, recipe_id):
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+        set_archived(Recipe.objects.filter(id=recipe.id), self.archived)
+
+        return Response({"id": recipe.id, "is_archived": self.archived})
+
+
+class RecipeResolvedView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get(self, request, recipe_id):
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+        return Response(get_resolved_recipe(recipe))
+
+
+class RecipeVersionListView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get(self, request, recipe_id):
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+
+        return Response(list_recipe_versions(recipe))
+
+
+class RecipeVersionDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectMember]
+
+    def get(self, request, recipe_id, version):
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+        snapshot = get_recipe_version(recipe, version)
+
+        if snapshot is None:
+            return Response({"detail": "Version not found"}, status=404)
+
+        return Response(snapshot)
+
+
+class RollbackRecipeView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+
+    def post(self, request, recipe_id, version):
+        recipe = get_object_or_404(Recipe, id=recipe_id)
+
+        snapshot = get_recipe_version(recipe, version)
+        if snapshot is None:
+            return Response({"detail": "Version not found"}, status=404)
+
+        combination_ids = {combo["combination_id"] for combo in snapshot["combinations"]}
+        tag_ids = {
+            tag_value["tag_id"]
+            for combo in snapshot["combinations"]
+            for tag_value in combo["tag_values"]
+        }
+        missing_combinations = combination_ids - set(
+            Combination.objects.filter(id__in=combination_ids).values_list("id", flat=True)
+        )
+        missing_tags = tag_ids - set(Tag.objects.filter(id__in=tag_ids).values_list("id", flat=True))
+        if missing_combinations or missing_tags:
+            return Response(
+                {
+                    "detail": "This version uses combinations or tags that no longer exist",
+                    "missing_combinations": sorted(missing_combinations),
+                    "missing_tags": sorted(missing_tags),
+                },
+                status=409
+            )
+
+        renamed = snapshot["name"] != recipe.name
+        if renamed and Recipe.objects.filter(
+            project_id=recipe.project_id,
+            name=snapshot["name"]
+        ).exists():
+            return Response(
+                {"detail": f"Another recipe is already named {snapshot['name']}"},
+                status=409
+            )
+
+        with transaction.atomic():
+            ensure_recipe_version(recipe)
+            if renamed:
+                Recipe.objects.filter(id=recipe.id).update(name=snapshot["name"])
+                recipe.name = snapshot["name"]
+                index_recipes([recipe])
+            RecipeCombination.objects.filter(recipe=recipe).delete()
+            create_recipe_combinations(recipe, [
+                {"id": combo["combination_id"], "tag_values": combo["tag_values"]}
+                for combo in snapshot["combinations"]
+            ])
+            bump_recipe_version(recipe)
+
+        return Response({
+            "id": recipe.id,
+            "version": recipe.version,
+            "restored_version": version,
+        })
+
+
+class CreateRecipeView(APIView):
+    permission_classes = [IsAuthenticated, IsProjectAdmin]
+
+    def post(self, request, project_id):
+        serializer = RecipeCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        name = serializer.validated_data["name"]
+        combinations_data = serializer.validated_data["combinations"]
+
+        if Recipe.objects.filter(name=name, project_id=project_id).exists():
+            return Response(
+                {"detail": "Recipe with this name already exists"},
+                status=400
             )
 
-            for tag_value in combo_data.get("tag_values", []):
-                RecipeCombinationTagValue.objects.create(
-                    recipe_combination=recipe_combo,
-                    tag_id=tag_value["tag_id"],
-                    value=tag_value["value"]
+        try:
+            with transaction.atomic():
+                recipe = Recipe.objects.create(
+                    name=name,
+                    project_id=project_id,
+                    version=1
                 )
 
+                create_recipe_combinations(recipe, combinations_data)
+                record_recipe_version(recipe)
+        except IntegrityError as exc:
+            if not is_duplicate_recipe_name(exc):
+                raise
+            return Response(
+                {"detail": "Recipe with this name already exists"},
+                status=400
+            )
+
         return Response(
             {"id": recipe.id, "name": recipe.name},
             status=201
-        )
\ No newline at end of file
+        )
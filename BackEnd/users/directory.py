@@ -0,0 +1,97 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+DIRECTORY_TABLE = "users_directory_fts"
+MAX_DIRECTORY_TOKENS = 6
+
+
+def compact_email(email):
+    return re.sub(r"[^0-9a-z]", "", email.lower())
+
+
+def index_users(users):
+    if not users:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {DIRECTORY_TABLE} (rowid, email, email_compact, full_name) "
+            "VALUES (%s, %s, %s, %s)",
+            [
+                (user.id, user.email.lower(), compact_email(user.email), user.full_name)
+                for user in users
+            ]
+        )
+
+
+def remove_user(user_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {DIRECTORY_TABLE} WHERE rowid = %s", [user_id])
+
+
+# Token prefixes match words of the email or the name ("jo do" finds
+# john.doe@...), and the compact column lets a typed email prefix match
+# across its punctuation ("johnd" finds john.doe@...).
+def match_expression(q):
+    tokens = re.findall(r"\w+", q.lower())[:MAX_DIRECTORY_TOKENS]
+    if not tokens:
+        return ""
+
+    words = " ".join(f'"{token}"*' for token in tokens)
+    return f'({words}) OR email_compact : "{compact_email(q)}"*'
+
+
+def search_directory_cache_key(project_id, q):
+    version = cache.get_or_set(f"users:directory:{project_id}:version", 1, None)
+    digest = hashlib.sha1(q.lower().encode()).hexdigest()
+    return f"users:directory:{project_id}:{version}:{digest}"
+
+
+def invalidate_directory_search(project_id):
+    try:
+        cache.incr(f"users:directory:{project_id}:version")
+    except ValueError:
+        pass
+
+
+# Active users matching the query who are not accepted members of the
+# project, best match first. Results are cached per project for a short
+# while since the invite dialog searches on every keystroke.
+def search_directory(project_id, q, limit):
+    expression = match_expression(q)
+    if not expression:
+        return []
+
+    key = search_directory_cache_key(project_id, q)
+    results = cache.get(key)
+    if results is not None:
+        return results
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT u.id, u.email, u.full_name
+            FROM {DIRECTORY_TABLE}
+            JOIN users_user u ON u.id = {DIRECTORY_TABLE}.rowid
+            WHERE {DIRECTORY_TABLE} MATCH %s
+              AND u.is_active
+              AND NOT EXISTS (
+                SELECT 1 FROM projects_projectmember m
+                WHERE m.project_id = %s AND m.user_id = u.id AND m.status = 'accepted'
+              )
+            ORDER BY bm25({DIRECTORY_TABLE})
+            LIMIT %s
+            """,
+            [expression, project_id.hex, limit]
+        )
+        results = [
+            {"id": user_id, "email": email, "full_name": full_name}
+            for user_id, email, full_name in cursor.fetchall()
+        ]
+
+    cache.set(key, results, getattr(settings, "USER_DIRECTORY_CACHE_TIMEOUT", 30))
+    return results
@@ -0,0 +1,38 @@
+import re
+
+from django.db import migrations
+
+
+def index_existing_users(apps, schema_editor):
+    User = apps.get_model("users", "User")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users_directory_fts (rowid, email, email_compact, full_name) "
+            "VALUES (%s, %s, %s, %s)",
+            [
+                (user_id, email.lower(), re.sub(r"[^0-9a-z]", "", email.lower()), full_name)
+                for user_id, email, full_name in (
+                    User.objects.values_list("id", "email", "full_name").iterator()
+                )
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE VIRTUAL TABLE users_directory_fts USING fts5("
+                "email, email_compact, full_name, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+            ),
+            reverse_sql="DROP TABLE users_directory_fts",
+        ),
+        migrations.RunPython(index_existing_users, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from config.instrumentation import TimedSerializerMixin
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from .models import User
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     confirm_password = serializers.CharField(write_only=True)
 
@@ -24,7 +25,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return User.objects.create_user(**validated_data)
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(TimedSerializerMixin, serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
@@ -45,7 +46,7 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
-class ChangePasswordSerializer(serializers.Serializer):
+class ChangePasswordSerializer(TimedSerializerMixin, serializers.Serializer):
     current_password = serializers.CharField()
     new_password = serializers.CharField()
 
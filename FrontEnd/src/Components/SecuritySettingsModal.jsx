@@ -16,6 +16,8 @@ const SecuritySettingsModal = ({ isOpen, onClose, project }) => {
   const [loadingMembers, setLoadingMembers] = useState(true);
   const [totalMembers, setTotalMembers] = useState(0);
   const [currentPage, setCurrentPage] = useState(0);
+  const [pageCursors, setPageCursors] = useState([null]);
+  const [hasMore, setHasMore] = useState(false);
   const [pageSize] = useState(5);
   const [newPassword, setNewPassword] = useState("");
   const [showPassword, setShowPassword] = useState(false);
@@ -27,19 +29,21 @@ const SecuritySettingsModal = ({ isOpen, onClose, project }) => {
 
   useEffect(() => {
     if (isOpen && project?.id) {
-      fetchMembers(0);
+      setPageCursors([null]);
+      fetchMembers(0, [null]);
     }
   }, [isOpen, project?.id]);
 
-  const fetchMembers = async (page = 0) => {
+  const fetchMembers = async (page = 0, cursors = pageCursors) => {
     try {
       setLoadingMembers(true);
-      const offset = page * pageSize;
-      const response = await api.get(
-        `/api/projects/${project.id}/members/?limit=${pageSize}&offset=${offset}`,
-      );
+      const response = await api.get(`/api/projects/${project.id}/members/`, {
+        params: { limit: pageSize, cursor: cursors[page] || undefined },
+      });
       setMembers(response.data.results || []);
       setTotalMembers(response.data.count || 0);
+      setHasMore(response.data.has_more);
+      setPageCursors([...cursors.slice(0, page + 1), response.data.next_cursor]);
       setCurrentPage(page);
     } catch (err) {
       setMessage("Failed to load members");
@@ -183,7 +187,7 @@ const SecuritySettingsModal = ({ isOpen, onClose, project }) => {
 
   const totalPages = Math.ceil(totalMembers / pageSize);
   const canPrevious = currentPage > 0;
-  const canNext = currentPage < totalPages - 1;
+  const canNext = hasMore;
   const adminCount = members.filter((m) => m.role === "admin").length;
 
   if (!isOpen || !project) return null;
@@ -7,14 +7,17 @@ const ViewMembersModal = ({ project, onClose }) => {
   const [members, setMembers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
-  const [offset, setOffset] = useState(0);
+  const [page, setPage] = useState(0);
+  const [cursors, setCursors] = useState([null]);
+  const [hasMore, setHasMore] = useState(false);
   const limit = 10;
+  const offset = page * limit;
 
   const isRootAdmin = project.role === "root_admin";
 
   useEffect(() => {
     fetchMembers();
-  }, [offset]);
+  }, [page]);
 
   const fetchMembers = async () => {
     try {
@@ -22,10 +25,12 @@ const ViewMembersModal = ({ project, onClose }) => {
       const res = await api.get(
         `/api/projects/${project.id}/members/`,
         {
-          params: { limit, offset }
+          params: { limit, cursor: cursors[page] || undefined }
         }
       );
       setMembers(res.data.results || []);
+      setHasMore(res.data.has_more);
+      setCursors(prev => [...prev.slice(0, page + 1), res.data.next_cursor]);
       setError("");
     } catch (err) {
       console.error(err);
@@ -128,8 +133,8 @@ const ViewMembersModal = ({ project, onClose }) => {
           <div className="pagination-controls">
             <button
               className="btn-pagination"
-              disabled={offset === 0}
-              onClick={() => setOffset(Math.max(0, offset - limit))}
+              disabled={page === 0}
+              onClick={() => setPage(Math.max(0, page - 1))}
             >
               ← Previous
             </button>
@@ -140,8 +145,8 @@ const ViewMembersModal = ({ project, onClose }) => {
 
             <button
               className="btn-pagination"
-              disabled={members.length < limit}
-              onClick={() => setOffset(offset + limit)}
+              disabled={!hasMore}
+              onClick={() => setPage(page + 1)}
             >
               Next →
             </button>
@@ -5,16 +5,21 @@ import ModalPortal from "../../Utility/ModalPortal";
 const ViewRecipeModal = ({ projectId, onClose, onSelect }) => {
   const [recipes, setRecipes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
 
   useEffect(() => {
     fetchRecipes();
   }, []);
 
-  const fetchRecipes = async () => {
+  const fetchRecipes = async (cursor = null) => {
     const res = await api.get(
-      `/api/recipes/projects/${projectId}/recipes/`
+      `/api/recipes/projects/${projectId}/recipes/`,
+      { params: cursor ? { cursor } : {} }
     );
-    setRecipes(res.data);
+    setRecipes((prev) =>
+      cursor ? [...prev, ...res.data.results] : res.data.results
+    );
+    setNextCursor(res.data.has_more ? res.data.next_cursor : null);
     setLoading(false);
   };
 
@@ -45,6 +50,17 @@ const ViewRecipeModal = ({ projectId, onClose, onSelect }) => {
             )}
           </div>
 
+          {nextCursor && (
+            <div className="modal-actions">
+              <button
+                className="button secondary"
+                onClick={() => fetchRecipes(nextCursor)}
+              >
+                Load more
+              </button>
+            </div>
+          )}
+
           <div className="modal-actions">
             <button className="button secondary" onClick={onClose}>
               Close
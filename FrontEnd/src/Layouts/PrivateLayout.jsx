@@ -4,7 +4,7 @@ import Sidebar from "@/Components/Sidebar/Sidebar";
 import Navbar from "@/Components/Navbar/Navbar";
 import { useEffect, useState } from "react";
 import ProjectPasswordModal from "@/Components/ProjectPasswordModal";
-import api from "@/Utility/api";
+import api, { storeProjectAccessToken } from "@/Utility/api";
 
 const PrivateLayout = () => {
   const { authenticated } = useAuth();
@@ -46,10 +46,15 @@ const PrivateLayout = () => {
           isOpen={true}
           projectId={passwordProjectId}
           onVerified={async (password) => {
-            await api.post(
+            const res = await api.post(
               `/api/projects/${passwordProjectId}/verify-password/`,
               { password }
             );
+            storeProjectAccessToken(
+              passwordProjectId,
+              res.data.access_token,
+              res.data.expires_in_hours
+            );
 
             if (retryRequest) {
               await api(retryRequest);
@@ -1,6 +1,6 @@
 import React, { useMemo, useState, useEffect } from "react";
 import { Eye, EyeOff, Check, X } from "lucide-react";
-import api from "../Utility/api";
+import api, { storeProjectAccessToken } from "../Utility/api";
 import { useAuth } from "../Utility/AuthContext";
 import InvitationDetailModal from "../Components/InvitationDetailModal";
 import ProjectPasswordModal from "../Components/ProjectPasswordModal";
@@ -65,10 +65,15 @@ const Account = () => {
 
     setRespondingTo(acceptingInvitation.id);
     try {
-      await api.post(
+      const res = await api.post(
         `/api/projects/invitations/${acceptingInvitation.id}/accept/`,
         { password },
       );
+      storeProjectAccessToken(
+        res.data.project.id,
+        res.data.access_token,
+        res.data.expires_in_hours,
+      );
 
       setInvitations((prev) =>
         prev.filter((inv) => inv.id !== acceptingInvitation.id),
@@ -16,6 +16,32 @@ export const injectLoader = (callback) => {
   loaderCallback = callback;
 };
 
+const PROJECT_ACCESS_KEY = "projectAccessTokens";
+// The server reads at most this many tokens from X-Project-Access
+// (MAX_ACCESS_TOKENS in projects/access_tokens.py).
+const MAX_PROJECT_ACCESS_TOKENS = 20;
+
+const readProjectAccessTokens = () => {
+  const now = Date.now();
+  const stored = JSON.parse(localStorage.getItem(PROJECT_ACCESS_KEY) || "{}");
+
+  return Object.fromEntries(
+    Object.entries(stored)
+      .filter(([, entry]) => entry.expiresAt > now)
+      .sort(([, a], [, b]) => b.expiresAt - a.expiresAt)
+      .slice(0, MAX_PROJECT_ACCESS_TOKENS)
+  );
+};
+
+export const storeProjectAccessToken = (projectId, token, expiresInHours) => {
+  const tokens = readProjectAccessTokens();
+  tokens[projectId] = {
+    token,
+    expiresAt: Date.now() + expiresInHours * 60 * 60 * 1000,
+  };
+  localStorage.setItem(PROJECT_ACCESS_KEY, JSON.stringify(tokens));
+};
+
 const startLoading = () => {
   activeRequests++;
   loaderCallback(true);
@@ -37,6 +63,19 @@ api.interceptors.request.use(
       config.headers.Authorization = `Bearer ${accessToken}`;
     }
 
+    // Only the token for the project in the URL when there is one; recipe
+    // URLs don't name their project, so those carry the newest tokens.
+    const storedTokens = readProjectAccessTokens();
+    const projectId = extractProjectId(config.url);
+    const projectTokens = projectId
+      ? [storedTokens[projectId]].filter(Boolean)
+      : Object.values(storedTokens);
+    if (projectTokens.length) {
+      config.headers["X-Project-Access"] = projectTokens
+        .map((entry) => entry.token)
+        .join(",");
+    }
+
     return config;
   },
   (error) => {
@@ -67,7 +106,9 @@ api.interceptors.response.use(
       window.dispatchEvent(
         new CustomEvent("PROJECT_PASSWORD_REQUIRED", {
           detail: {
-            projectId: extractProjectId(originalRequest.url),
+            projectId:
+              error.response.data.project_id ||
+              extractProjectId(originalRequest.url),
             retryRequest: originalRequest,
           },
         })